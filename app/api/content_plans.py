@@ -14,6 +14,7 @@ from app.db import schemas, crud
 from app.db.schemas_content_brief import ContentBriefCreate
 from app.db.crud_content_brief import content_brief_crud
 from app.core.dependencies import get_current_active_user
+from app.core.context_cache import invalidate_plan_topic_counts
 from app.db.models import User
 
 # Configure logging
@@ -937,6 +938,8 @@ async def delete_generated_content(
         content_plan.updated_at = datetime.utcnow()
         
         db.commit()
+        # Bulk DELETE bypasses ORM events
+        invalidate_plan_topic_counts(plan_id)
         
         logger.info(f"Deleted all content for plan {plan_id}: {topics_count} topics, {drafts_count} drafts, {variants_count} variants")
         
@@ -1064,6 +1067,8 @@ async def hard_delete_content_plan(
         db.delete(content_plan)
         
         db.commit()
+        # Bulk DELETE bypasses ORM events
+        invalidate_plan_topic_counts(plan_id)
         
         logger.info(f"Hard deleted content plan {plan_id} and all related data")
         
@@ -12,6 +12,7 @@ from celery import chain
 from app.db.database import get_db
 from app.core.dependencies import get_current_user
 from app.db import crud, models, schemas
+from app.core.context_cache import invalidate_plan_topic_counts
 from app.tasks.advanced_content_generation import (
     advanced_contextualize_task,
     generate_topics_with_reasoning_task,
@@ -76,6 +77,8 @@ async def generate_content_with_reasoning(
             models.SuggestedTopic.content_plan_id == plan_id
         ).update({"is_active": False})
         db.commit()
+        # Bulk UPDATE bypasses ORM events
+        invalidate_plan_topic_counts(plan_id)
     
     # Create task chain for advanced generation
     task_chain = chain(
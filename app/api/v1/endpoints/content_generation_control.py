@@ -6,12 +6,16 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from pydantic import BaseModel
 
-from app.core.dependencies import get_db, get_current_user
-from app.db.models import User, ContentPlan, SuggestedTopic
-from app.db import crud
+from app.core.dependencies import get_db, get_owned_plan_id
+from app.db.models import SuggestedTopic, ContentDraft, ContentVariant
+from app.core.context_cache import (
+    get_cached_plan_topic_counts,
+    set_cached_plan_topic_counts,
+    invalidate_plan_topic_counts,
+)
 from app.tasks.selective_generation import (
     generate_variants_for_approved_sm_topics,
     generate_single_topic_variants
@@ -34,11 +38,10 @@ class BulkTopicApprovalRequest(BaseModel):
 
 @router.post("/content-plans/{plan_id}/generate-sm-variants")
 async def generate_sm_variants(
-    plan_id: int,
     request: GenerateVariantsRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    plan_id: int = Depends(get_owned_plan_id),
+    db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Generate content variants for SM topics
@@ -49,14 +52,6 @@ async def generate_sm_variants(
     - Filter by platform names
     """
     
-    # Validate access
-    content_plan = crud.content_plan_crud.get_by_id(db, plan_id)
-    if not content_plan:
-        raise HTTPException(status_code=404, detail="Content plan not found")
-    
-    if not any(org.id == content_plan.organization_id for org in current_user.organizations):
-        raise HTTPException(status_code=403, detail="Access forbidden")
-    
     # Validate request
     if not request.topic_ids and not request.generate_all_approved:
         raise HTTPException(
@@ -76,14 +71,16 @@ async def generate_sm_variants(
     
     elif request.topic_ids:
         # Validate topics belong to the plan and are SM topics
-        topics = db.query(SuggestedTopic).filter(
-            SuggestedTopic.id.in_(request.topic_ids),
-            SuggestedTopic.content_plan_id == plan_id,
-            SuggestedTopic.category == "social_media",
-            SuggestedTopic.is_active == True
+        topic_ids = db.scalars(
+            select(SuggestedTopic.id).where(
+                SuggestedTopic.id.in_(request.topic_ids),
+                SuggestedTopic.content_plan_id == plan_id,
+                SuggestedTopic.category == "social_media",
+                SuggestedTopic.is_active == True
+            )
         ).all()
         
-        if len(topics) != len(request.topic_ids):
+        if len(topic_ids) != len(request.topic_ids):
             raise HTTPException(
                 status_code=400,
                 detail="Some topic IDs are invalid or not SM topics"
@@ -107,39 +104,34 @@ async def generate_sm_variants(
 
 @router.post("/content-plans/{plan_id}/topics/bulk-approval")
 async def bulk_approve_topics(
-    plan_id: int,
     request: BulkTopicApprovalRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    plan_id: int = Depends(get_owned_plan_id),
+    db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Bulk approve/reject topics with optional variant generation
     """
     
-    # Validate access
-    content_plan = crud.content_plan_crud.get_by_id(db, plan_id)
-    if not content_plan:
-        raise HTTPException(status_code=404, detail="Content plan not found")
-    
-    if not any(org.id == content_plan.organization_id for org in current_user.organizations):
-        raise HTTPException(status_code=403, detail="Access forbidden")
-    
     # Validate status
     if request.status not in ["approved", "rejected", "suggested"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    # Update topics
-    updated_count = db.query(SuggestedTopic).filter(
+    topics_filter = (
         SuggestedTopic.id.in_(request.topic_ids),
         SuggestedTopic.content_plan_id == plan_id,
         SuggestedTopic.is_active == True
-    ).update({
+    )
+    
+    # Update topics
+    updated_count = db.query(SuggestedTopic).filter(*topics_filter).update({
         "status": request.status,
         "updated_at": datetime.utcnow()
     })
     
     db.commit()
+    # Bulk UPDATE bypasses ORM events; the next status read rebuilds the counters
+    invalidate_plan_topic_counts(plan_id)
     
     response = {
         "message": f"Updated {updated_count} topics to {request.status}",
@@ -149,15 +141,15 @@ async def bulk_approve_topics(
     # Generate variants if requested and topics were approved
     if request.generate_variants and request.status == "approved":
         # Filter for SM topics only
-        sm_topic_ids = db.query(SuggestedTopic.id).filter(
-            SuggestedTopic.id.in_(request.topic_ids),
-            SuggestedTopic.category == "social_media",
-            SuggestedTopic.status == "approved",
-            SuggestedTopic.is_active == True
+        sm_topic_ids = db.scalars(
+            select(SuggestedTopic.id).where(
+                SuggestedTopic.id.in_(request.topic_ids),
+                SuggestedTopic.category == "social_media",
+                SuggestedTopic.status == "approved",
+                SuggestedTopic.is_active == True
+            )
         ).all()
         
-        sm_topic_ids = [t[0] for t in sm_topic_ids]
-        
         if sm_topic_ids:
             task_ids = []
             for topic_id in sm_topic_ids:
@@ -175,37 +167,35 @@ async def bulk_approve_topics(
 
 @router.get("/content-plans/{plan_id}/generation-status")
 async def get_generation_status(
-    plan_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    plan_id: int = Depends(get_owned_plan_id),
+    db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Get content generation status for a plan
     """
     
-    # Validate access
-    content_plan = crud.content_plan_crud.get_by_id(db, plan_id)
-    if not content_plan:
-        raise HTTPException(status_code=404, detail="Content plan not found")
-    
-    if not any(org.id == content_plan.organization_id for org in current_user.organizations):
-        raise HTTPException(status_code=403, detail="Access forbidden")
-    
-    # Get topic counts by status and category
-    topic_stats = db.query(
-        SuggestedTopic.category,
-        SuggestedTopic.status,
-        func.count(SuggestedTopic.id).label('count')
-    ).filter(
-        SuggestedTopic.content_plan_id == plan_id,
-        SuggestedTopic.is_active == True
-    ).group_by(
-        SuggestedTopic.category,
-        SuggestedTopic.status
-    ).all()
+    # Get topic counts by status and category, rebuilding the cached
+    # counters from the aggregate on a miss
+    topic_counts = get_cached_plan_topic_counts(plan_id)
+    if topic_counts is None:
+        topic_stats = db.query(
+            SuggestedTopic.category,
+            SuggestedTopic.status,
+            func.count(SuggestedTopic.id).label('count')
+        ).filter(
+            SuggestedTopic.content_plan_id == plan_id,
+            SuggestedTopic.is_active == True
+        ).group_by(
+            SuggestedTopic.category,
+            SuggestedTopic.status
+        ).all()
+        
+        topic_counts = {}
+        for category, status, count in topic_stats:
+            topic_counts.setdefault(category, {})[status] = count
+        set_cached_plan_topic_counts(plan_id, topic_counts)
     
     # Get variant counts
-    from sqlalchemy import func
     variant_count = db.query(func.count(ContentVariant.id)).join(
         ContentDraft
     ).join(
@@ -217,15 +207,10 @@ async def get_generation_status(
     
     # Format statistics
     stats = {
-        "topics": {},
+        "topics": topic_counts,
         "variants": {
             "total": variant_count
         }
     }
     
-    for category, status, count in topic_stats:
-        if category not in stats["topics"]:
-            stats["topics"][category] = {}
-        stats["topics"][category][status] = count
-    
     return stats
\ No newline at end of file
@@ -1,8 +1,79 @@
-from functools import lru_cache
-from typing import Optional
+import logging
+import threading
+from typing import Dict, Iterable, Optional
+from cachetools import TTLCache
+from sqlalchemy import event, func, lambda_stmt, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 from sqlalchemy.orm import Session
 
 from app.db.models import AIModelAssignment, OrganizationAIModelAssignment
+from app.core.context_cache import (
+    get_cached_assignments,
+    set_cached_assignments,
+    invalidate_cached_assignments,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cache przypisań modeli współdzielony w procesie: (organization_id, task_name) -> model_name
+_MODEL_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=300)
+_MODEL_CACHE_LOCK = threading.Lock()
+_MISSING = object()
+
+
+def invalidate_model_cache(task_name: Optional[str] = None) -> None:
+    """
+    Usuwa z cache przypisania modeli dla zadania (lub wszystkie, gdy task_name=None).
+    Zmiana globalnego przypisania wpływa na wszystkie organizacje, więc
+    usuwamy wpisy zadania niezależnie od organization_id.
+    """
+    with _MODEL_CACHE_LOCK:
+        if task_name is None:
+            _MODEL_CACHE.clear()
+            return
+        for key in [k for k in _MODEL_CACHE.keys() if k[1] == task_name]:
+            _MODEL_CACHE.pop(key, None)
+
+
+@event.listens_for(AIModelAssignment, "after_insert")
+@event.listens_for(AIModelAssignment, "after_update")
+@event.listens_for(AIModelAssignment, "after_delete")
+@event.listens_for(OrganizationAIModelAssignment, "after_insert")
+@event.listens_for(OrganizationAIModelAssignment, "after_update")
+@event.listens_for(OrganizationAIModelAssignment, "after_delete")
+def _invalidate_assignment(mapper, connection, target):
+    """Unieważnia cache po każdej zmianie przypisania zapisanej przez ORM."""
+    invalidate_model_cache(target.task_name)
+    invalidate_cached_assignments(getattr(target, 'organization_id', None))
+
+
+def _global_model_subquery(task_name: str):
+    return select(AIModelAssignment.model_name)\
+        .where(AIModelAssignment.task_name == task_name)\
+        .limit(1)\
+        .scalar_subquery()
+
+
+def _global_model_stmt(task_name: str) -> StatementLambdaElement:
+    """
+    Zapytanie o globalny model. lambda_stmt zapamiętuje skompilowaną postać,
+    a task_name trafia do niej jako parametr.
+    """
+    return lambda_stmt(lambda: select(_global_model_subquery(task_name)))
+
+
+def _org_model_stmt(organization_id: int, task_name: str) -> StatementLambdaElement:
+    """Zapytanie o model organizacji z fallbackiem na globalny (COALESCE)."""
+    return lambda_stmt(lambda: select(func.coalesce(
+        select(OrganizationAIModelAssignment.model_name)
+        .where(OrganizationAIModelAssignment.organization_id == organization_id)
+        .where(OrganizationAIModelAssignment.task_name == task_name)
+        .where(OrganizationAIModelAssignment.is_active == True)
+        .limit(1)
+        .scalar_subquery(),
+        _global_model_subquery(task_name)
+    )))
 
 
 class AIConfigService:
@@ -14,6 +85,8 @@ class AIConfigService:
     def __init__(self, db_session: Session, organization_id: Optional[int] = None):
         self.db_session = db_session
         self.organization_id = organization_id
+        # Przypisania pobrane przez prefetch_all (None = nie pobrano)
+        self._assignments_map: Optional[dict] = None
     
     async def get_model_for_task(self, task_name: str) -> Optional[str]:
         """
@@ -26,65 +99,102 @@ class AIConfigService:
         Returns:
             Nazwa modelu jako string lub None jeśli nie znaleziono
         """
-        try:
-            # Jeśli podano organization_id, najpierw szukaj konfiguracji organizacji
-            if self.organization_id:
-                org_assignment = self.db_session.query(OrganizationAIModelAssignment)\
-                    .filter(OrganizationAIModelAssignment.organization_id == self.organization_id)\
-                    .filter(OrganizationAIModelAssignment.task_name == task_name)\
-                    .filter(OrganizationAIModelAssignment.is_active == True)\
-                    .first()
-                
-                if org_assignment:
-                    return org_assignment.model_name
-            
-            # Jeśli nie znaleziono konfiguracji organizacji, użyj globalnej
-            result = self.db_session.query(AIModelAssignment)\
-                .filter(AIModelAssignment.task_name == task_name)\
-                .first()
-            
-            if result:
-                return result.model_name
-            return None
-            
-        except Exception as e:
-            print(f"Błąd podczas pobierania modelu dla zadania {task_name}: {str(e)}")
-            return None
+        return self._get_cached_model(task_name)
     
     def _get_cached_model(self, task_name: str) -> Optional[str]:
         """
         Cache'owana wersja get_model_for_task dla lepszej wydajności.
-        Uwaga: Cache jest per instancja, więc różne organizacje mają osobne cache.
+        Cache jest współdzielony w procesie i kluczowany (organization_id, task_name).
         """
+        if self._assignments_map is not None:
+            return self._assignments_map.get(task_name)
+        
+        cache_key = (self.organization_id, task_name)
+        with _MODEL_CACHE_LOCK:
+            model_name = _MODEL_CACHE.get(cache_key, _MISSING)
+        if model_name is not _MISSING:
+            return model_name
+        
         try:
-            # Jeśli podano organization_id, najpierw szukaj konfiguracji organizacji
-            if self.organization_id:
-                org_assignment = self.db_session.query(OrganizationAIModelAssignment)\
-                    .filter(OrganizationAIModelAssignment.organization_id == self.organization_id)\
-                    .filter(OrganizationAIModelAssignment.task_name == task_name)\
-                    .filter(OrganizationAIModelAssignment.is_active == True)\
-                    .first()
-                
-                if org_assignment:
-                    return org_assignment.model_name
-            
-            # Jeśli nie znaleziono konfiguracji organizacji, użyj globalnej
-            result = self.db_session.query(AIModelAssignment)\
-                .filter(AIModelAssignment.task_name == task_name)\
-                .first()
-            
-            if result:
-                return result.model_name
-            return None
-            
-        except Exception as e:
-            print(f"Błąd podczas pobierania modelu z cache dla zadania {task_name}: {str(e)}")
+            model_name = self._query_model(task_name)
+        except Exception:
+            logger.exception("Błąd podczas pobierania modelu dla zadania %s", task_name)
             return None
+        
+        # Zapamiętujemy również None, żeby brak przypisania nie odpytywał bazy
+        with _MODEL_CACHE_LOCK:
+            _MODEL_CACHE[cache_key] = model_name
+        return model_name
+    
+    def get_models_bulk(self, task_names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Zwraca modele dla wielu zadań naraz. Brakujące w cache zadania
+        pobierane są jednym zapytaniem (UNION ALL przypisań globalnych
+        i organizacji, organizacja ma pierwszeństwo).
+        """
+        task_names = list(dict.fromkeys(task_names))
+        if self._assignments_map is not None:
+            return {name: self._assignments_map.get(name) for name in task_names}
+        
+        models = {}
+        with _MODEL_CACHE_LOCK:
+            for name in task_names:
+                model_name = _MODEL_CACHE.get((self.organization_id, name), _MISSING)
+                if model_name is not _MISSING:
+                    models[name] = model_name
+        missing = [name for name in task_names if name not in models]
+        if not missing:
+            return models
+        
+        try:
+            rows = self.db_session.execute(self._models_bulk_stmt(missing))
+        except Exception:
+            logger.exception("Błąd podczas pobierania modeli dla zadań %s", missing)
+            return {**models, **{name: None for name in missing}}
+        
+        found, priorities = {}, {}
+        for task_name, model_name, priority in rows:
+            if priority >= priorities.get(task_name, -1):
+                found[task_name] = model_name
+                priorities[task_name] = priority
+        
+        with _MODEL_CACHE_LOCK:
+            for name in missing:
+                models[name] = found.get(name)
+                _MODEL_CACHE[(self.organization_id, name)] = models[name]
+        return models
+    
+    def _models_bulk_stmt(self, task_names: list):
+        global_rows = select(
+            AIModelAssignment.task_name,
+            AIModelAssignment.model_name,
+            literal(0).label('priority')
+        ).where(AIModelAssignment.task_name.in_(task_names))
+        if not self.organization_id:
+            return global_rows
+        
+        org_rows = select(
+            OrganizationAIModelAssignment.task_name,
+            OrganizationAIModelAssignment.model_name,
+            literal(1).label('priority')
+        ).where(OrganizationAIModelAssignment.organization_id == self.organization_id)\
+            .where(OrganizationAIModelAssignment.is_active == True)\
+            .where(OrganizationAIModelAssignment.task_name.in_(task_names))
+        return union_all(global_rows, org_rows)
+    
+    def _query_model(self, task_name: str) -> Optional[str]:
+        """
+        Pobiera model z bazy jednym zapytaniem: przypisanie organizacji ma
+        pierwszeństwo przed globalnym (COALESCE dwóch podzapytań).
+        """
+        organization_id = self.organization_id
+        if not organization_id:
+            return self.db_session.execute(_global_model_stmt(task_name)).scalar()
+        return self.db_session.execute(_org_model_stmt(organization_id, task_name)).scalar()
     
     def clear_cache(self):
         """Czyści cache przypisań modeli."""
-        # Z powodu zmiany implementacji, cache jest teraz per-instancja
-        pass
+        invalidate_model_cache()
     
     async def update_model_assignment(self, task_name: str, model_name: str) -> bool:
         """
@@ -99,96 +209,139 @@ class AIConfigService:
             True jeśli aktualizacja się powiodła, False w przeciwnym razie
         """
         try:
+            # INSERT ... ON CONFLICT DO UPDATE - jedno zapytanie, bez wyścigu
+            # między równoległymi aktualizacjami tego samego zadania
             if self.organization_id:
                 # Zarządzaj przypisaniem dla organizacji
-                existing = self.db_session.query(OrganizationAIModelAssignment)\
-                    .filter(OrganizationAIModelAssignment.organization_id == self.organization_id)\
-                    .filter(OrganizationAIModelAssignment.task_name == task_name)\
-                    .first()
+                base_assignment_id = select(AIModelAssignment.id)\
+                    .where(AIModelAssignment.task_name == task_name)\
+                    .scalar_subquery()
                 
-                if existing:
-                    existing.model_name = model_name
-                    existing.is_active = True
-                else:
-                    # Znajdź base assignment jeśli istnieje
-                    base_assignment = self.db_session.query(AIModelAssignment)\
-                        .filter(AIModelAssignment.task_name == task_name)\
-                        .first()
-                    
-                    new_assignment = OrganizationAIModelAssignment(
-                        organization_id=self.organization_id,
-                        task_name=task_name,
-                        model_name=model_name,
-                        base_assignment_id=base_assignment.id if base_assignment else None,
-                        is_active=True
-                    )
-                    self.db_session.add(new_assignment)
+                stmt = pg_insert(OrganizationAIModelAssignment).values(
+                    organization_id=self.organization_id,
+                    task_name=task_name,
+                    model_name=model_name,
+                    base_assignment_id=base_assignment_id,
+                    is_active=True
+                ).on_conflict_do_update(
+                    index_elements=[
+                        OrganizationAIModelAssignment.organization_id,
+                        OrganizationAIModelAssignment.task_name
+                    ],
+                    set_={
+                        'model_name': model_name,
+                        'is_active': True,
+                        'updated_at': func.now()
+                    }
+                )
             else:
                 # Zarządzaj globalnym przypisaniem
-                existing = self.db_session.query(AIModelAssignment)\
-                    .filter(AIModelAssignment.task_name == task_name)\
-                    .first()
-                
-                if existing:
-                    existing.model_name = model_name
-                else:
-                    new_assignment = AIModelAssignment(
-                        task_name=task_name,
-                        model_name=model_name
-                    )
-                    self.db_session.add(new_assignment)
+                stmt = pg_insert(AIModelAssignment).values(
+                    task_name=task_name,
+                    model_name=model_name
+                ).on_conflict_do_update(
+                    index_elements=[AIModelAssignment.task_name],
+                    set_={
+                        'model_name': model_name,
+                        'updated_at': func.now()
+                    }
+                )
             
+            self.db_session.execute(stmt)
             self.db_session.commit()
+            if self._assignments_map is not None:
+                self._assignments_map[task_name] = model_name
+            # Upsert omija zdarzenia ORM, więc cache czyścimy jawnie po commicie
+            invalidate_model_cache(task_name)
+            invalidate_cached_assignments(self.organization_id)
             return True
             
-        except Exception as e:
-            print(f"Błąd podczas aktualizacji przypisania modelu {task_name}: {str(e)}")
+        except Exception:
+            logger.exception("Błąd podczas aktualizacji przypisania modelu %s", task_name)
             self.db_session.rollback()
             return False
     
+    def prefetch_all(self) -> None:
+        """
+        Pobiera jednorazowo wszystkie przypisania (globalne + organizacji)
+        i zapamiętuje je na instancji. Kolejne wywołania get_model_for_task
+        w ramach tego samego żądania nie odpytują już bazy ani cache.
+        """
+        try:
+            self._assignments_map = {
+                task_name: data['model_name']
+                for task_name, data in self._load_assignments().items()
+            }
+        except Exception:
+            logger.exception("Błąd podczas wstępnego pobierania przypisań")
+            self._assignments_map = None
+    
+    def _load_assignments(self) -> dict:
+        """
+        Zwraca słownik task_name -> dane przypisania.
+        Przypisania organizacji nadpisują globalne.
+        """
+        assignments = {}
+        
+        # Najpierw pobierz globalne przypisania (tylko potrzebne kolumny)
+        global_assignments = self.db_session.execute(
+            select(
+                AIModelAssignment.task_name,
+                AIModelAssignment.model_name,
+                AIModelAssignment.description
+            )
+        )
+        for task_name, model_name, description in global_assignments:
+            assignments[task_name] = {
+                'model_name': model_name,
+                'is_custom': False,
+                'description': description
+            }
+        
+        # Jeśli mamy organization_id, nadpisz przypisaniami organizacji
+        if self.organization_id:
+            org_assignments = self.db_session.execute(
+                select(
+                    OrganizationAIModelAssignment.task_name,
+                    OrganizationAIModelAssignment.model_name
+                )
+                .where(OrganizationAIModelAssignment.organization_id == self.organization_id)
+                .where(OrganizationAIModelAssignment.is_active == True)
+            )
+            
+            for task_name, model_name in org_assignments:
+                assignments[task_name] = {
+                    'model_name': model_name,
+                    'is_custom': True,
+                    'description': None  # Można dodać opis do modelu organizacji
+                }
+        
+        return assignments
+    
     async def get_all_assignments(self) -> list:
         """
         Pobiera wszystkie przypisania modeli.
         Dla organizacji zwraca połączenie przypisań organizacji i globalnych.
         """
+        cached = get_cached_assignments(self.organization_id)
+        if cached is not None:
+            return cached
+        
         try:
-            assignments = {}
-            
-            # Najpierw pobierz globalne przypisania
-            global_assignments = self.db_session.query(AIModelAssignment).all()
-            for assignment in global_assignments:
-                assignments[assignment.task_name] = {
-                    'model_name': assignment.model_name,
-                    'is_custom': False,
-                    'description': assignment.description
-                }
-            
-            # Jeśli mamy organization_id, nadpisz przypisaniami organizacji
-            if self.organization_id:
-                org_assignments = self.db_session.query(OrganizationAIModelAssignment)\
-                    .filter(OrganizationAIModelAssignment.organization_id == self.organization_id)\
-                    .filter(OrganizationAIModelAssignment.is_active == True)\
-                    .all()
-                
-                for assignment in org_assignments:
-                    assignments[assignment.task_name] = {
-                        'model_name': assignment.model_name,
-                        'is_custom': True,
-                        'description': None  # Można dodać opis do modelu organizacji
-                    }
-            
-            return [
+            assignments = [
                 {
                     'task_name': task_name,
                     'model_name': data['model_name'],
                     'is_custom': data['is_custom'],
                     'description': data['description']
                 }
-                for task_name, data in assignments.items()
+                for task_name, data in self._load_assignments().items()
             ]
+            set_cached_assignments(self.organization_id, assignments)
+            return assignments
             
-        except Exception as e:
-            print(f"Błąd podczas pobierania wszystkich przypisań: {str(e)}")
+        except Exception:
+            logger.exception("Błąd podczas pobierania wszystkich przypisań")
             return []
 
 
@@ -1,13 +1,43 @@
 """
 AI Service module for Gemini AI integration
 """
+import asyncio
 import os
 import logging
+import threading
+from functools import lru_cache
 from typing import Optional
 import google.generativeai as genai
 
+from app.core.context_cache import get_cached_context, set_cached_context
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_NAME = 'gemini-1.5-flash'
+
+# Responses generated at or below this temperature are cached
+CACHEABLE_MAX_TEMPERATURE = 0.2
+RESPONSE_CACHE_TTL_HOURS = 24
+
+_configured_api_key: Optional[str] = None
+_configure_lock = threading.Lock()
+
+
+def _configure(api_key: str) -> None:
+    """Configure the Gemini SDK once per process (or again if the key changes)"""
+    global _configured_api_key
+    with _configure_lock:
+        if _configured_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+            _get_model.cache_clear()
+
+
+@lru_cache(maxsize=8)
+def _get_model(model_name: str) -> genai.GenerativeModel:
+    """Return a shared GenerativeModel so its client and channel are reused across instances"""
+    return genai.GenerativeModel(model_name)
+
 
 class GeminiAI:
     """
@@ -21,17 +51,18 @@ class GeminiAI:
             raise ValueError("Gemini API key not configured")
         
         # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        _configure(self.api_key)
         
-        # Initialize model
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        # Reuse the process-wide model
+        self.model = _get_model(DEFAULT_MODEL_NAME)
         logger.info("GeminiAI service initialized")
     
     async def generate_content(
         self,
         prompt: str,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True
     ) -> str:
         """
         Generate content using Gemini AI
@@ -40,10 +71,19 @@ class GeminiAI:
             prompt: The prompt to send to the AI
             temperature: Temperature for generation (0.0-1.0)
             max_tokens: Maximum tokens to generate
+            use_cache: Reuse responses for identical near-deterministic prompts
             
         Returns:
             Generated content as string
         """
+        # Only near-deterministic generations are safe to replay
+        cache_key = None
+        if use_cache and temperature <= CACHEABLE_MAX_TEMPERATURE:
+            cache_key = ["gemini", self.model.model_name, temperature, max_tokens, prompt]
+            cached = get_cached_context(cache_key)
+            if cached is not None:
+                return cached["text"]
+        
         try:
             # Configure generation settings
             generation_config = genai.GenerationConfig(
@@ -51,14 +91,19 @@ class GeminiAI:
                 max_output_tokens=max_tokens or 2000,
             )
             
-            # Generate content
-            response = self.model.generate_content(
+            # Sync call in a worker thread: the shared model's async (grpc.aio)
+            # client would stay bound to the first event loop, and Celery tasks
+            # run each job on a fresh loop
+            response = await asyncio.to_thread(
+                self.model.generate_content,
                 prompt,
                 generation_config=generation_config
             )
             
             # Return the generated text
             if response and response.text:
+                if cache_key is not None:
+                    set_cached_context(cache_key, {"text": response.text}, ttl_hours=RESPONSE_CACHE_TTL_HOURS)
                 return response.text
             else:
                 logger.error("Empty response from Gemini AI")
@@ -1,5 +1,7 @@
+from functools import lru_cache
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Tuple, Union
 import os
 
 class Settings(BaseSettings):
@@ -7,6 +9,10 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "postgresql://ada_user:ada_password@db:5432/ada_db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30  # seconds
+    db_pool_recycle: int = 1800  # seconds
     
     # Redis
     redis_url: str = "redis://redis:6379/0"
@@ -29,17 +35,33 @@ class Settings(BaseSettings):
     gemini_api_key: Optional[str] = None
     google_ai_api_key: Optional[str] = None
     
-    # CORS
-    cors_origins: list = [
-        "http://localhost:3000", 
-        "http://localhost:8081", 
-        "http://frontend:3000", 
-        "http://host.docker.internal:8081"
-    ]
+    # Deep reasoning - one fused Gemini call instead of the five-stage chain
+    deep_reasoning_single_pass: bool = False
+    
+    # CORS - CORS_ORIGINS accepts a comma-separated list or a JSON array.
+    # `str` in the union lets a non-JSON env value reach the validator below.
+    cors_origins: Union[Tuple[str, ...], str] = (
+        "http://localhost:3000",
+        "http://localhost:8081",
+        "http://frontend:3000",
+        "http://host.docker.internal:8081",
+    )
+    
+    @field_validator("cors_origins", mode="before")
+    @classmethod
+    def split_cors_origins(cls, value):
+        if isinstance(value, str):
+            return tuple(origin.strip() for origin in value.split(",") if origin.strip())
+        return value
     
     class Config:
         env_file = ".env"
         case_sensitive = False
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings; call get_settings.cache_clear() to re-read the environment"""
+    return Settings()
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
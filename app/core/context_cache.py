@@ -5,17 +5,30 @@ Context caching utilities for content generation
 import json
 import hashlib
 from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-from functools import lru_cache
+from datetime import timedelta
+import threading
+from cachetools import TTLCache
 import redis
-import pickle
+import orjson
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+REDIS_MAX_CONNECTIONS = 50
+
 # Try to connect to Redis
 try:
-    redis_client = redis.Redis(host='redis', port=6379, db=0, decode_responses=False)
+    redis_pool = redis.ConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        socket_keepalive=True,
+        health_check_interval=30,
+        client_name="ada-context-cache",
+        decode_responses=False
+    )
+    redis_client = redis.Redis(connection_pool=redis_pool)
     redis_client.ping()
     REDIS_AVAILABLE = True
 except:
@@ -23,36 +36,58 @@ except:
     REDIS_AVAILABLE = False
     logger.warning("Redis not available, using in-memory cache only")
 
-# In-memory cache fallback
-_memory_cache: Dict[str, tuple[Any, datetime]] = {}
 CACHE_TTL = timedelta(hours=2)
+MEMORY_CACHE_SIZE = 1024
+
+# In-memory cache fallback (bounded LRU with monotonic-clock expiry)
+_memory_cache: TTLCache = TTLCache(maxsize=MEMORY_CACHE_SIZE, ttl=CACHE_TTL.total_seconds())
+_memory_cache_lock = threading.RLock()
+CLEAR_BATCH_SIZE = 500
+CONTEXT_KEY_PREFIX = b"ada:context:"
+CONTEXT_KEY_PERSON = b"ada:context"
 
-def _get_cache_key(key_parts: list) -> str:
-    """Generate a cache key from parts"""
-    key_string = "|".join(str(part) for part in key_parts)
-    return f"ada:context:{hashlib.md5(key_string.encode()).hexdigest()}"
+def _get_cache_key(key_parts: list) -> bytes:
+    """Generate a binary cache key from parts (redis-py accepts bytes keys)"""
+    # Hash parts one by one instead of building the joined string first
+    digest = hashlib.blake2b(digest_size=16, person=CONTEXT_KEY_PERSON)
+    for i, part in enumerate(key_parts):
+        if i:
+            digest.update(b"|")
+        digest.update(str(part).encode("utf-8", "surrogatepass"))
+    # Raw digest instead of hex: half the key bytes and no hex conversion
+    return CONTEXT_KEY_PREFIX + digest.digest()
+
+def _deserialize(payload: bytes) -> Optional[Any]:
+    """Decode a cached payload; anything that is not valid JSON is treated as a miss"""
+    try:
+        return orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        logger.warning("Ignoring undecodable context cache entry")
+        return None
 
 def get_cached_context(key_parts: list) -> Optional[Dict[str, Any]]:
     """Get context from cache"""
     cache_key = _get_cache_key(key_parts)
     
-    # Try Redis first
+    # Try memory cache first - no network round-trip for hot keys
+    with _memory_cache_lock:
+        value = _memory_cache.get(cache_key)
+    if value is not None:
+        return value
+    
+    # Then Redis, promoting hits into the memory cache
     if REDIS_AVAILABLE:
         try:
             cached = redis_client.get(cache_key)
             if cached:
-                return pickle.loads(cached)
+                value = _deserialize(cached)
+                if value is not None:
+                    with _memory_cache_lock:
+                        _memory_cache[cache_key] = value
+                return value
         except Exception as e:
             logger.error(f"Redis get error: {e}")
     
-    # Fallback to memory cache
-    if cache_key in _memory_cache:
-        value, timestamp = _memory_cache[cache_key]
-        if datetime.utcnow() - timestamp < CACHE_TTL:
-            return value
-        else:
-            del _memory_cache[cache_key]
-    
     return None
 
 def set_cached_context(key_parts: list, context: Dict[str, Any], ttl_hours: int = 2) -> None:
@@ -65,46 +100,204 @@ def set_cached_context(key_parts: list, context: Dict[str, Any], ttl_hours: int
             redis_client.setex(
                 cache_key,
                 timedelta(hours=ttl_hours),
-                pickle.dumps(context)
+                orjson.dumps(context, option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS)
             )
         except Exception as e:
             logger.error(f"Redis set error: {e}")
     
     # Always set in memory cache as fallback
-    _memory_cache[cache_key] = (context, datetime.utcnow())
-    
-    # Clean old entries from memory cache
-    if len(_memory_cache) > 100:
-        now = datetime.utcnow()
-        expired_keys = [
-            k for k, (_, ts) in _memory_cache.items()
-            if now - ts > CACHE_TTL
-        ]
-        for k in expired_keys:
-            del _memory_cache[k]
+    with _memory_cache_lock:
+        _memory_cache[cache_key] = context
 
 def clear_context_cache(pattern: Optional[str] = None) -> None:
     """Clear context cache"""
+    pattern_bytes = pattern.encode() if pattern else b""
+    
     if REDIS_AVAILABLE and pattern:
         try:
-            for key in redis_client.scan_iter(f"ada:context:{pattern}*"):
-                redis_client.delete(key)
+            # Delete in batches through a pipeline instead of one round-trip per key
+            pipeline = redis_client.pipeline(transaction=False)
+            batch = []
+            for key in redis_client.scan_iter(match=CONTEXT_KEY_PREFIX + pattern_bytes + b"*", count=CLEAR_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= CLEAR_BATCH_SIZE:
+                    pipeline.delete(*batch)
+                    pipeline.execute()
+                    batch.clear()
+            if batch:
+                pipeline.delete(*batch)
+                pipeline.execute()
         except Exception as e:
             logger.error(f"Redis clear error: {e}")
     
     # Clear memory cache
-    if pattern:
-        keys_to_delete = [k for k in _memory_cache.keys() if pattern in k]
-        for k in keys_to_delete:
-            del _memory_cache[k]
-    else:
-        _memory_cache.clear()
-
-@lru_cache(maxsize=128)
-def get_cached_prompt_template(prompt_name: str, prompt_template: str) -> str:
-    """Cache compiled prompt templates"""
-    return prompt_template
-
-def invalidate_prompt_cache():
-    """Invalidate prompt template cache"""
-    get_cached_prompt_template.cache_clear()
\ No newline at end of file
+    with _memory_cache_lock:
+        if pattern:
+            keys_to_delete = [k for k in _memory_cache.keys() if pattern_bytes in k]
+            for k in keys_to_delete:
+                _memory_cache.pop(k, None)
+        else:
+            _memory_cache.clear()
+
+# Content plan -> organization mapping used by access checks on polled endpoints
+PLAN_ORG_TTL = timedelta(hours=1)
+
+def _get_plan_org_key(plan_id: int) -> str:
+    """Generate the cache key for a plan's owning organization"""
+    return f"ada:plan:{plan_id}:org"
+
+def get_cached_plan_organization(plan_id: int) -> Optional[int]:
+    """Get the cached organization id of a content plan"""
+    if not REDIS_AVAILABLE:
+        return None
+    try:
+        cached = redis_client.get(_get_plan_org_key(plan_id))
+        if cached is not None:
+            return int(cached)
+    except Exception as e:
+        logger.error(f"Redis get error: {e}")
+    return None
+
+def set_cached_plan_organization(plan_id: int, organization_id: int) -> None:
+    """Cache the organization id of a content plan"""
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        redis_client.setex(_get_plan_org_key(plan_id), PLAN_ORG_TTL, organization_id)
+    except Exception as e:
+        logger.error(f"Redis set error: {e}")
+
+def invalidate_plan_organization(plan_id: int) -> None:
+    """Drop the cached organization id of a content plan"""
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        redis_client.delete(_get_plan_org_key(plan_id))
+    except Exception as e:
+        logger.error(f"Redis delete error: {e}")
+
+
+# Per-plan topic counters ({category}:{status} -> count) for generation status polling.
+# Writers drop the hash after changing topics; the TTL bounds drift from any that do not.
+PLAN_COUNTS_TTL = timedelta(minutes=10)
+
+def _get_plan_counts_key(plan_id: int) -> str:
+    """Generate the cache key for a plan's topic counters"""
+    return f"ada:plan:{plan_id}:counts"
+
+def get_cached_plan_topic_counts(plan_id: int) -> Optional[Dict[str, Dict[str, int]]]:
+    """Get cached topic counts of a plan as {category: {status: count}}"""
+    if not REDIS_AVAILABLE:
+        return None
+    try:
+        cached = redis_client.hgetall(_get_plan_counts_key(plan_id))
+    except Exception as e:
+        logger.error(f"Redis get error: {e}")
+        return None
+    if not cached:
+        return None
+    
+    counts: Dict[str, Dict[str, int]] = {}
+    for field, value in cached.items():
+        category, _, status = field.decode().partition(":")
+        counts.setdefault(category, {})[status] = int(value)
+    return counts
+
+def set_cached_plan_topic_counts(plan_id: int, counts: Dict[str, Dict[str, int]]) -> None:
+    """Cache topic counts of a plan given as {category: {status: count}}"""
+    if not REDIS_AVAILABLE or not counts:
+        return
+    cache_key = _get_plan_counts_key(plan_id)
+    mapping = {
+        f"{category}:{status}": count
+        for category, statuses in counts.items()
+        for status, count in statuses.items()
+    }
+    try:
+        pipeline = redis_client.pipeline()
+        pipeline.delete(cache_key)
+        pipeline.hset(cache_key, mapping=mapping)
+        pipeline.expire(cache_key, PLAN_COUNTS_TTL)
+        pipeline.execute()
+    except Exception as e:
+        logger.error(f"Redis set error: {e}")
+
+def invalidate_plan_topic_counts(plan_id: int) -> None:
+    """Drop cached topic counts of a plan"""
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        redis_client.delete(_get_plan_counts_key(plan_id))
+    except Exception as e:
+        logger.error(f"Redis delete error: {e}")
+
+
+
+# Version of the AI prompt templates. Bumped after every committed prompt change
+# so the per-process template caches (prompt_manager) drop entries written elsewhere.
+PROMPTS_VERSION_KEY = "ada:prompts:version"
+
+def get_prompts_version() -> Optional[int]:
+    """Get the current prompt template version (None without Redis)"""
+    if not REDIS_AVAILABLE:
+        return None
+    try:
+        return int(redis_client.get(PROMPTS_VERSION_KEY) or 0)
+    except Exception as e:
+        logger.error(f"Redis get error: {e}")
+        return None
+
+def bump_prompts_version() -> None:
+    """Mark every cached prompt template as stale in all processes"""
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        redis_client.incr(PROMPTS_VERSION_KEY)
+    except Exception as e:
+        logger.error(f"Redis incr error: {e}")
+
+# Merged AI model assignments per organization (admin UI polling)
+ASSIGNMENTS_TTL = timedelta(seconds=60)
+
+def _get_assignments_key(organization_id: Optional[int]) -> str:
+    """Generate the cache key for an organization's (or global) model assignments"""
+    return f"ada:aiconfig:assignments:{organization_id or 'global'}"
+
+def get_cached_assignments(organization_id: Optional[int]) -> Optional[list]:
+    """Get cached model assignments of an organization"""
+    if not REDIS_AVAILABLE:
+        return None
+    try:
+        cached = redis_client.get(_get_assignments_key(organization_id))
+        if cached:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.error(f"Redis get error: {e}")
+    return None
+
+def set_cached_assignments(organization_id: Optional[int], assignments: list) -> None:
+    """Cache model assignments of an organization"""
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        redis_client.setex(_get_assignments_key(organization_id), ASSIGNMENTS_TTL, orjson.dumps(assignments))
+    except Exception as e:
+        logger.error(f"Redis set error: {e}")
+
+def invalidate_cached_assignments(organization_id: Optional[int] = None) -> None:
+    """
+    Drop cached model assignments of an organization.
+    Without organization_id every entry is dropped, since a global change
+    shows through in all organizations.
+    """
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        if organization_id:
+            redis_client.delete(_get_assignments_key(organization_id))
+            return
+        keys = list(redis_client.scan_iter(match="ada:aiconfig:assignments:*", count=CLEAR_BATCH_SIZE))
+        if keys:
+            redis_client.delete(*keys)
+    except Exception as e:
+        logger.error(f"Redis delete error: {e}")
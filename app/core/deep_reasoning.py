@@ -7,82 +7,310 @@ using Chain-of-Thought, research integration, and iterative refinement.
 
 import json
 import logging
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
+import os
+import re
+import threading
+import weakref
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
 import asyncio
 import aiohttp
+import orjson
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.prompt_manager import PromptManager
 from app.core.ai_config_service import AIConfigService
-from app.tasks.content_generation import _call_gemini_api
+from app.core.context_cache import get_cached_context, set_cached_context
+from app.core.http_client import get_session
+from app.core.tavily_client import tavily_client
+from app.tasks.content_generation import _call_gemini_api, genai, GEMINI_API_AVAILABLE, BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
 
-class DeepReasoningEngine:
+# Longest string kept verbatim when embedding data in a prompt
+PROMPT_MAX_STR = 500
+
+
+def _prune(obj: Any, max_str: int = PROMPT_MAX_STR) -> Any:
+    """Drop empty leaves (None, "", [], {}) and truncate long strings"""
+    if isinstance(obj, dict):
+        pruned = ((k, _prune(v, max_str)) for k, v in obj.items())
+        return {k: v for k, v in pruned if v is not None and v != "" and v != [] and v != {}}
+    if isinstance(obj, (list, tuple)):
+        pruned = (_prune(v, max_str) for v in obj)
+        return [v for v in pruned if v is not None and v != "" and v != [] and v != {}]
+    if isinstance(obj, str) and len(obj) > max_str:
+        return obj[:max_str]
+    return obj
+
+
+def _compact(obj: Any) -> str:
+    """Serialize data for a prompt: pruned, no indentation, UTF-8"""
+    return orjson.dumps(_prune(obj), option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Outermost JSON object/array in a response wrapped in prose or ``` fences
+_JSON_BLOCK_RE = re.compile(r"\{.*\}|\[.*\]", re.S)
+
+
+def _parse_json(response: Optional[str]) -> Any:
     """
-    Advanced reasoning engine that uses multi-step approach for content generation
+    Parse a Gemini JSON response, tolerating text around the JSON.
+    Raises ValueError (orjson.JSONDecodeError) when nothing parses.
+    """
+    if not response:
+        raise ValueError("Empty response")
+    try:
+        return orjson.loads(response)
+    except orjson.JSONDecodeError:
+        match = _JSON_BLOCK_RE.search(response)
+        if match is None:
+            raise
+        return orjson.loads(match.group(0))
+
+
+# _call_gemini_api runs at temperature 0.1, so identical prompts can be replayed
+LLM_CACHE_TTL_HOURS = 24
+
+
+# Gemini explicit context caching - only worth it (and only accepted) for large preambles
+CONTEXT_CACHE_MIN_CHARS = 32768 * 4  # ~32k tokens
+CONTEXT_CACHE_TTL = timedelta(minutes=10)
+
+
+def _create_context_cache(context_blob: str, model: str) -> Optional[Any]:
+    """Upload the invariant context preamble once; None when not applicable"""
+    if not GEMINI_API_AVAILABLE or len(context_blob) < CONTEXT_CACHE_MIN_CHARS:
+        return None
+    try:
+        return genai.caching.CachedContent.create(
+            model=model,
+            contents=[f"Context:\n{context_blob}"],
+            ttl=CONTEXT_CACHE_TTL
+        )
+    except Exception as e:
+        # e.g. model aliases such as *-latest do not support caching
+        logger.warning(f"Gemini context cache unavailable for {model}: {e}")
+        return None
+
+
+def _delete_context_cache(context_cache: Any) -> None:
+    try:
+        context_cache.delete()
+    except Exception as e:
+        logger.warning(f"Failed to delete Gemini context cache: {e}")
+
+
+def _call_gemini_with_context_cache(instruction: str, context_cache: Any) -> Optional[str]:
+    """Send only the step instruction, referencing the uploaded context"""
+    try:
+        model = genai.GenerativeModel.from_cached_content(cached_content=context_cache)
+        response = model.generate_content(
+            instruction,
+            generation_config=genai.types.GenerationConfig(
+                temperature=0.1,
+                max_output_tokens=8192,
+                response_mime_type="application/json"
+            )
+        )
+        return response.text.strip() if response and response.text else None
+    except Exception as e:
+        logger.warning(f"Gemini call with cached context failed, sending full prompt: {e}")
+        return None
+
+
+async def _stream_gemini(prompt: str, model_name: str) -> AsyncIterator[str]:
     """
+    Yield response text chunks as Gemini streams them.
+
+    The SDK stream is consumed in a worker thread (the engine also runs on
+    short-lived Celery event loops, which the SDK's async client would not survive).
+    Closing the generator stops the worker at its next chunk.
+    """
+    api_key = os.getenv('GOOGLE_AI_API_KEY')
+    if not GEMINI_API_AVAILABLE or not api_key:
+        return
     
-    def __init__(self, db: Session):
-        self.db = db
-        self.prompt_manager = PromptManager(db)
-        self.ai_config = AIConfigService(db)
-        
-    async def analyze_with_reasoning(
-        self, 
-        context: Dict[str, Any], 
-        task_type: str = "generate_topics"
-    ) -> Dict[str, Any]:
-        """
-        Perform deep analysis using Chain-of-Thought reasoning
-        
-        Args:
-            context: Input context including briefs, strategy, etc.
-            task_type: Type of task (generate_topics, analyze_brief, etc.)
-            
-        Returns:
-            Enhanced context with reasoning steps and results
-        """
-        logger.info(f"Starting deep reasoning for task: {task_type}")
-        
-        # Step 1: Context Understanding
-        understanding = await self._understand_context(context)
-        
-        # Step 2: Research Enhancement
-        research_data = await self._conduct_research(understanding)
-        
-        # Step 3: Strategy Formulation
-        strategy = await self._formulate_strategy(understanding, research_data)
-        
-        # Step 4: Creative Generation
-        creative_output = await self._generate_creative_content(strategy, context)
-        
-        # Step 5: Quality Evaluation
-        evaluated_output = await self._evaluate_and_refine(creative_output, context)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    
+    def put(item: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # loop already closed
+    
+    def produce() -> None:
+        try:
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(model_name)
+            response = model.generate_content(
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.1,
+                    max_output_tokens=8192,
+                    response_mime_type="application/json"
+                ),
+                stream=True
+            )
+            for chunk in response:
+                if stop.is_set():
+                    break
+                put(chunk.text)
+        except Exception as e:
+            put(e)
+        finally:
+            put(None)
+    
+    loop.run_in_executor(None, produce)
+    try:
+        while (item := await queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+class _StreamedArrayItems:
+    """Incrementally decode the items of the first JSON array in a growing text"""
+    
+    def __init__(self):
+        self._buffer = ""
+        self._pos: Optional[int] = None
+        self._decoder = json.JSONDecoder()
+    
+    def feed(self, text: str) -> List[Any]:
+        """Append a chunk and return the items completed by it"""
+        self._buffer += text
+        items = []
+        if self._pos is None:
+            start = self._buffer.find("[")
+            if start == -1:
+                return items
+            self._pos = start + 1
         
-        return {
-            "reasoning_steps": {
-                "understanding": understanding,
-                "research": research_data,
-                "strategy": strategy,
-                "creative_output": creative_output,
-                "final_output": evaluated_output
-            },
-            "result": evaluated_output
-        }
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n,":
+                self._pos += 1
+            if self._pos >= len(self._buffer) or self._buffer[self._pos] == "]":
+                return items
+            try:
+                item, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                return items  # item not complete yet
+            items.append(item)
+
+
+async def _stream_array_items(prompt: str, model: str, limit: int) -> Optional[List[Any]]:
+    """
+    Stream a JSON-array response, stopping once `limit` items are decoded.
+
+    Returns None when the response is cached or streaming is unavailable;
+    callers then fall back to _acall_gemini.
+    """
+    cache_key = ["deep_reasoning", model, prompt]
+    if get_cached_context(cache_key) is not None:
+        return None
     
-    async def _understand_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Step 1: Deep understanding of the context using Chain-of-Thought
-        """
-        prompt = f"""
-Analyze the following context for content generation using step-by-step reasoning:
+    parser = _StreamedArrayItems()
+    items = []
+    stream = _stream_gemini(prompt, model)
+    try:
+        async for text in stream:
+            items.extend(parser.feed(text))
+            if len(items) >= limit:
+                break
+    except Exception as e:
+        logger.warning(f"Gemini streaming failed, falling back to a buffered call: {e}")
+        return None
+    finally:
+        await stream.aclose()
+    
+    if not items:
+        return None
+    
+    items = items[:limit]
+    set_cached_context(cache_key, {"text": orjson.dumps(items).decode()}, ttl_hours=LLM_CACHE_TTL_HOURS)
+    return items
+
+
+def _call_gemini_cached(
+    prompt: str, 
+    model: str, 
+    context_cache: Optional[Any] = None, 
+    instruction: Optional[str] = None
+) -> Optional[str]:
+    """
+    Gemini call with an exact-match (model, prompt) response cache.
+
+    With a context cache for the same model, only the instruction is sent;
+    the response is still stored under the full prompt.
+    """
+    cache_key = ["deep_reasoning", model, prompt]
+    cached = get_cached_context(cache_key)
+    if cached is not None:
+        return cached["text"]
+    
+    response = None
+    if context_cache is not None and instruction and context_cache.model.endswith(model):
+        response = _call_gemini_with_context_cache(instruction, context_cache)
+    if not response:
+        response = _call_gemini_api(prompt, model)
+    if response:
+        set_cached_context(cache_key, {"text": response}, ttl_hours=LLM_CACHE_TTL_HOURS)
+    return response
+
+
+async def _acall_gemini(
+    prompt: str, 
+    model: str, 
+    context_cache: Optional[Any] = None, 
+    instruction: Optional[str] = None
+) -> Optional[str]:
+    """Run the blocking Gemini call in a worker thread so stages can overlap"""
+    return await asyncio.to_thread(_call_gemini_cached, prompt, model, context_cache, instruction)
 
+
+# Prompt templates - static text built once, only the data is substituted per call
+_SINGLE_PASS_TMPL = """
 Context:
-{json.dumps(context, ensure_ascii=False, indent=2)}
+{ctx}
+
+Research Results:
+{research}
+
+Using step-by-step reasoning, produce a single JSON object with these keys:
+
+1. "understanding": analysis of the context - organization (industry, goals,
+   target audience), briefs (key topics, priorities, constraints), strategy
+   (tone, forbidden phrases, CTAs, platforms), content requirements and key insights.
+
+2. "research_insights": from the research results - trending topics, content gaps,
+   competitor strategies, audience interests and pain points, timely opportunities.
+
+3. "strategy": content pillars (3-5), content mix ratios, topic clusters,
+   differentiation strategy and brief alignment, with rationale.
+
+4. "topics": array of {topics_to_generate} blog topics, each with "title", "description",
+   "pillar", "brief_alignment", "unique_angle", "target_keywords" (3-5),
+   "content_type" ("educational" | "thought_leadership" | "case_study" | "how_to" | "industry_insights")
+   and "priority_score" (1-10). Topics must be diverse across pillars, aligned with
+   brief priorities, informed by research and must NOT repeat rejected topics.
+
+5. "evaluation": quality score (1-10), improvements and concerns for each topic,
+   judged on brief alignment, diversity, audience appeal, uniqueness, feasibility and SEO potential.
+
+6. "refined_topics": the final topic list with the improvements applied.
+"""
+
+_UNDERSTAND_INSTRUCTION = """
+Analyze the above context for content generation using step-by-step reasoning.
 
 Please think through this step-by-step:
 
@@ -113,46 +341,16 @@ Please think through this step-by-step:
 
 Provide your analysis in JSON format with detailed reasoning for each section.
 """
-        
-        model = self.ai_config._get_cached_model("deep_reasoning") or "gemini-1.5-pro-latest"
-        response = _call_gemini_api(prompt, model)
-        
-        try:
-            return json.loads(response)
-        except:
-            return {"error": "Failed to parse understanding", "raw": response}
-    
-    async def _conduct_research(self, understanding: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Step 2: Conduct research using Tavily and other sources
-        """
-        research_topics = []
-        
-        # Extract topics to research from understanding
-        if "organization_analysis" in understanding:
-            industry = understanding["organization_analysis"].get("industry", "")
-            if industry:
-                research_topics.append(f"{industry} trends 2024")
-                research_topics.append(f"{industry} content marketing best practices")
-        
-        if "key_insights" in understanding:
-            trends = understanding["key_insights"].get("industry_trends", [])
-            research_topics.extend(trends[:3])
-        
-        # Conduct Tavily research
-        research_results = {}
-        if research_topics:
-            research_results = await self._tavily_research(research_topics)
-        
-        # Analyze research results
-        research_prompt = f"""
+_UNDERSTAND_TMPL = "Context:\n{ctx}\n" + _UNDERSTAND_INSTRUCTION
+
+_RESEARCH_TMPL = """
 Based on the research data below, extract key insights for content creation:
 
 Research Results:
-{json.dumps(research_results, ensure_ascii=False, indent=2)}
+{research}
 
 Original Understanding:
-{json.dumps(understanding, ensure_ascii=False, indent=2)}
+{understanding}
 
 Provide:
 1. Top 5 trending topics in the industry
@@ -163,86 +361,15 @@ Provide:
 
 Format as JSON.
 """
-        
-        model = self.ai_config._get_cached_model("research_analysis") or "gemini-1.5-pro-latest"
-        response = _call_gemini_api(research_prompt, model)
-        
-        try:
-            return json.loads(response)
-        except:
-            return {"research_topics": research_topics, "raw_results": research_results}
-    
-    async def _tavily_research(self, topics: List[str]) -> Dict[str, Any]:
-        """
-        Perform research using Tavily API
-        """
-        import os
-        tavily_api_key = os.getenv('TAVILY_API_KEY')
-        
-        if not tavily_api_key:
-            logger.warning("Tavily API key not found")
-            return {}
-        
-        results = {}
-        
-        try:
-            # Use Tavily REST API
-            headers = {
-                "api-key": tavily_api_key,
-                "content-type": "application/json"
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                for topic in topics[:5]:  # Limit to 5 searches
-                    payload = {
-                        "query": topic,
-                        "search_depth": "advanced",
-                        "max_results": 5,
-                        "include_answer": True
-                    }
-                    
-                    async with session.post(
-                        "https://api.tavily.com/search",
-                        json=payload,
-                        headers=headers
-                    ) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            results[topic] = {
-                                "answer": data.get("answer", ""),
-                                "results": [
-                                    {
-                                        "title": r.get("title", ""),
-                                        "content": r.get("content", "")[:500],
-                                        "url": r.get("url", "")
-                                    }
-                                    for r in data.get("results", [])[:3]
-                                ]
-                            }
-                        else:
-                            logger.error(f"Tavily API error: {response.status}")
-                            
-        except Exception as e:
-            logger.error(f"Tavily research error: {e}")
-            
-        return results
-    
-    async def _formulate_strategy(
-        self, 
-        understanding: Dict[str, Any], 
-        research: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Step 3: Formulate content strategy based on understanding and research
-        """
-        strategy_prompt = f"""
+
+_STRATEGY_TMPL = """
 Based on the deep understanding and research, formulate a content strategy:
 
 Understanding:
-{json.dumps(understanding, ensure_ascii=False, indent=2)}
+{understanding}
 
 Research Insights:
-{json.dumps(research, ensure_ascii=False, indent=2)}
+{research}
 
 Create a comprehensive content strategy that includes:
 
@@ -274,38 +401,18 @@ Create a comprehensive content strategy that includes:
 
 Provide as detailed JSON with rationale for each decision.
 """
-        
-        model = self.ai_config._get_cached_model("strategy_formulation") or "gemini-1.5-pro-latest"
-        response = _call_gemini_api(strategy_prompt, model)
-        
-        try:
-            return json.loads(response)
-        except:
-            return {"error": "Failed to parse strategy", "raw": response}
-    
-    async def _generate_creative_content(
-        self, 
-        strategy: Dict[str, Any], 
-        original_context: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Step 4: Generate creative content based on strategy
-        """
-        # Extract content requirements
-        blog_quota = original_context.get("content_plan", {}).get("blog_posts_quota", 5)
-        topics_to_generate = blog_quota + 3  # Generate extra for selection
-        
-        creative_prompt = f"""
+
+_CREATIVE_TMPL = """
 Based on the content strategy, generate {topics_to_generate} creative blog topics:
 
 Strategy:
-{json.dumps(strategy, ensure_ascii=False, indent=2)}
+{strategy}
 
 Original Requirements:
-- Organization: {original_context.get("organization", {}).get("name", "Unknown")}
-- Industry: {original_context.get("organization", {}).get("industry", "Unknown")}
-- Brief Key Topics: {json.dumps(original_context.get("brief_insights", {}).get("key_topics", []), ensure_ascii=False)}
-- Communication Style: {json.dumps(original_context.get("communication_strategy", {}).get("general_style", {}), ensure_ascii=False)}
+- Organization: {organization}
+- Industry: {industry}
+- Brief Key Topics: {key_topics}
+- Communication Style: {style}
 
 For each topic, provide:
 1. "title": Engaging, SEO-friendly title
@@ -326,34 +433,12 @@ Ensure topics are:
 
 Format as JSON array.
 """
-        
-        model = self.ai_config._get_cached_model("creative_generation") or "gemini-1.5-pro-latest"
-        response = _call_gemini_api(creative_prompt, model)
-        
-        try:
-            topics = json.loads(response)
-            return {"topics": topics, "count": len(topics)}
-        except:
-            return {"error": "Failed to parse creative output", "raw": response}
-    
-    async def _evaluate_and_refine(
-        self, 
-        creative_output: Dict[str, Any], 
-        context: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Step 5: Evaluate and refine the generated content
-        """
-        if "error" in creative_output:
-            return creative_output
-            
-        topics = creative_output.get("topics", [])
-        
-        evaluation_prompt = f"""
+
+_EVALUATION_TMPL = """
 Evaluate and refine the generated topics using these criteria:
 
 Generated Topics:
-{json.dumps(topics, ensure_ascii=False, indent=2)}
+{topics}
 
 Evaluation Criteria:
 1. Brief Alignment: Do topics address brief requirements?
@@ -364,7 +449,7 @@ Evaluation Criteria:
 6. SEO Potential: Do topics have search potential?
 
 Brief Requirements:
-{json.dumps(context.get("brief_insights", {}), ensure_ascii=False, indent=2)}
+{brief_requirements}
 
 For each topic:
 1. Provide a quality score (1-10)
@@ -375,42 +460,15 @@ Then provide final refined list with improvements applied.
 
 Format as JSON with "evaluation" and "refined_topics" sections.
 """
-        
-        model = self.ai_config._get_cached_model("evaluation") or "gemini-1.5-pro-latest"
-        response = _call_gemini_api(evaluation_prompt, model)
-        
-        try:
-            evaluation_result = json.loads(response)
-            return evaluation_result.get("refined_topics", topics)
-        except:
-            return topics  # Return original if evaluation fails
-
 
-class EnhancedBriefAnalyzer:
-    """
-    Advanced brief analyzer using multi-layered analysis
-    """
-    
-    def __init__(self, db: Session):
-        self.db = db
-        self.reasoning_engine = DeepReasoningEngine(db)
-        
-    async def analyze_brief(
-        self, 
-        brief_text: str, 
-        organization_context: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Perform deep analysis of content brief
-        """
-        analysis_prompt = f"""
+_BRIEF_ANALYSIS_TMPL = """
 Perform a comprehensive analysis of this content brief:
 
 Brief Content:
-{brief_text[:8000]}
+{brief}
 
 Organization Context:
-{json.dumps(organization_context, ensure_ascii=False, indent=2)}
+{organization}
 
 Analyze the following aspects:
 
@@ -452,12 +510,445 @@ Analyze the following aspects:
 
 Provide detailed JSON analysis with confidence scores for each extraction.
 """
+
+_WEBSITE_TMPL = """
+Analyze this company website to understand their business:
+
+Website URL: {url}
+Content Preview: {content}
+
+Extract:
+1. Industry/Sector
+2. Main products/services
+3. Target market
+4. Company values/mission
+5. Key differentiators
+6. Content tone/style from existing content
+
+Format as JSON.
+"""
+
+_INDUSTRY_TMPL = """
+Synthesize industry insights from research:
+
+Industry: {industry}
+Research Data: {research}
+
+Provide:
+1. Top content themes in this industry
+2. Audience preferences
+3. Successful content formats
+4. Industry-specific terminology
+5. Compliance considerations
+6. Seasonal patterns
+
+Format as actionable JSON insights for content generation.
+"""
+
+# Whole-pipeline results, keyed by the context without fields that change per run
+REASONING_CACHE_TTL_HOURS = 1
+_VOLATILE_CONTEXT_KEYS = frozenset({"generation_timestamp", "timestamp", "created_at", "updated_at"})
+
+
+def _canonical_context(obj: Any) -> Any:
+    """Context with volatile fields removed (key order is normalized on serialization)"""
+    if isinstance(obj, dict):
+        return {k: _canonical_context(v) for k, v in obj.items() if k not in _VOLATILE_CONTEXT_KEYS}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical_context(v) for v in obj]
+    return obj
+
+
+# Model assignments used by the reasoning stages, resolved together up front
+REASONING_MODEL_TASKS = (
+    "deep_reasoning",
+    "research_analysis",
+    "strategy_formulation",
+    "creative_generation",
+    "evaluation",
+    "brief_analysis"
+)
+
+
+class DeepReasoningEngine:
+    """
+    Advanced reasoning engine that uses multi-step approach for content generation
+    """
+    
+    def __init__(
+        self, 
+        db: Session,
+        ai_config: Optional[AIConfigService] = None,
+        prompt_manager: Optional[PromptManager] = None
+    ):
+        self.db = db
+        self.prompt_manager = prompt_manager or PromptManager(db)
+        self.ai_config = ai_config or AIConfigService(db)
+        self._models: Dict[str, Optional[str]] = {}
+        
+    async def analyze_with_reasoning(
+        self, 
+        context: Dict[str, Any], 
+        task_type: str = "generate_topics"
+    ) -> Dict[str, Any]:
+        """
+        Perform deep analysis using Chain-of-Thought reasoning
+        
+        Args:
+            context: Input context including briefs, strategy, etc.
+            task_type: Type of task (generate_topics, analyze_brief, etc.)
+            
+        Returns:
+            Enhanced context with reasoning steps and results
+        """
+        logger.info(f"Starting deep reasoning for task: {task_type}")
+        
+        # Same organization/brief/plan context as a recent run - reuse its result
+        cache_key = [
+            "reasoning", 
+            task_type, 
+            settings.deep_reasoning_single_pass,
+            orjson.dumps(
+                _canonical_context(context), 
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        ]
+        cached = get_cached_context(cache_key)
+        if cached is not None:
+            logger.info("Reusing cached deep reasoning result")
+            return cached
+        
+        result = await self._run_pipeline(context)
+        
+        final_output = result["result"]
+        if not (isinstance(final_output, dict) and "error" in final_output):
+            set_cached_context(cache_key, result, ttl_hours=REASONING_CACHE_TTL_HOURS)
+        return result
+    
+    async def _run_pipeline(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the reasoning stages (or the single-pass variant)
+        """
+        self._resolve_models()
+        
+        if settings.deep_reasoning_single_pass:
+            return await self._analyze_single_pass(context)
+        
+        # Upload a large context once, reused by the stages that read it
+        context_blob = _compact(context)
+        context_cache = await asyncio.to_thread(
+            _create_context_cache, context_blob, self._model_for("deep_reasoning")
+        )
+        
+        try:
+            # Step 1: Context Understanding, with research on topics known
+            # up front (industry) running concurrently
+            understanding, preliminary_research = await asyncio.gather(
+                self._understand_context(context, context_blob, context_cache),
+                self._tavily_research(self._seed_topics(context))
+            )
+            
+            # Step 2: Research Enhancement
+            research_data = await self._conduct_research(understanding, preliminary_research)
+            
+            # Step 3: Strategy Formulation
+            strategy = await self._formulate_strategy(understanding, research_data)
+            
+            # Step 4: Creative Generation
+            creative_output = await self._generate_creative_content(strategy, context)
+            
+            # Step 5: Quality Evaluation
+            evaluated_output = await self._evaluate_and_refine(creative_output, context, context_cache)
+        finally:
+            if context_cache is not None:
+                await asyncio.to_thread(_delete_context_cache, context_cache)
+        
+        return {
+            "reasoning_steps": {
+                "understanding": understanding,
+                "research": research_data,
+                "strategy": strategy,
+                "creative_output": creative_output,
+                "final_output": evaluated_output
+            },
+            "result": evaluated_output
+        }
+    
+    async def _analyze_single_pass(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        All reasoning stages in one structured Gemini call.
+
+        Research is seeded from the raw context (industry) and folded into the
+        prompt, since there is no understanding step to derive topics from.
+        """
+        research_results = await self._tavily_research(self._seed_topics(context))
+        
+        blog_quota = context.get("content_plan", {}).get("blog_posts_quota", 5)
+        topics_to_generate = blog_quota + 3  # Generate extra for selection
+        
+        fused_prompt = _SINGLE_PASS_TMPL.format(
+            ctx=_compact(context),
+            research=_compact(research_results),
+            topics_to_generate=topics_to_generate
+        )
+        
+        model = self._model_for("deep_reasoning")
+        response = await _acall_gemini(fused_prompt, model)
+        
+        try:
+            fused = _parse_json(response)
+        except ValueError as e:
+            logger.warning(f"Failed to parse single-pass reasoning: {e}")
+            fused = None
+        
+        if isinstance(fused, dict) and "topics" in fused:
+            topics = fused["topics"]
+            creative_output = {"topics": topics, "count": len(topics)}
+            final_output = fused.get("refined_topics") or topics
+        else:
+            fused = {}
+            creative_output = final_output = {"error": "Failed to parse reasoning", "raw": response}
+        
+        return {
+            "reasoning_steps": {
+                "understanding": fused.get("understanding", {}),
+                "research": fused.get("research_insights") or {"raw_results": research_results},
+                "strategy": fused.get("strategy", {}),
+                "creative_output": creative_output,
+                "final_output": final_output
+            },
+            "result": final_output
+        }
+    
+    def _resolve_models(self) -> None:
+        """Fetch all stage model assignments in one lookup"""
+        if not self._models:
+            self._models = self.ai_config.get_models_bulk(REASONING_MODEL_TASKS)
+    
+    def _model_for(self, task_name: str) -> str:
+        if task_name in self._models:
+            model = self._models[task_name]
+        else:
+            model = self.ai_config._get_cached_model(task_name)
+        return model or "gemini-1.5-pro-latest"
+    
+    async def _understand_context(
+        self, 
+        context: Dict[str, Any], 
+        context_blob: Optional[str] = None, 
+        context_cache: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Step 1: Deep understanding of the context using Chain-of-Thought
+        """
+        if context_blob is None:
+            context_blob = _compact(context)
+        
+        # The context is the prompt prefix so it can be served from the context cache
+        prompt = _UNDERSTAND_TMPL.format(ctx=context_blob)
+        
+        model = self._model_for("deep_reasoning")
+        response = await _acall_gemini(prompt, model, context_cache, _UNDERSTAND_INSTRUCTION)
+        
+        try:
+            return _parse_json(response)
+        except ValueError as e:
+            logger.warning(f"Failed to parse understanding: {e}")
+            return {"error": "Failed to parse understanding", "raw": response}
+    
+    @staticmethod
+    def _industry_topics(industry: str) -> List[str]:
+        return [
+            f"{industry} trends 2024",
+            f"{industry} content marketing best practices"
+        ]
+    
+    def _seed_topics(self, context: Dict[str, Any]) -> List[str]:
+        """
+        Research topics derivable from the raw context, before understanding is ready
+        """
+        industry = (context.get("organization") or {}).get("industry", "")
+        return self._industry_topics(industry) if industry else []
+    
+    async def _conduct_research(
+        self, 
+        understanding: Dict[str, Any],
+        preliminary_research: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Step 2: Conduct research using Tavily and other sources
+        """
+        research_topics = []
+        
+        # Extract topics to research from understanding
+        if "organization_analysis" in understanding:
+            industry = understanding["organization_analysis"].get("industry", "")
+            if industry:
+                research_topics.extend(self._industry_topics(industry))
+        
+        if "key_insights" in understanding:
+            trends = understanding["key_insights"].get("industry_trends", [])
+            research_topics.extend(trends[:3])
+        
+        # Conduct Tavily research, skipping topics already covered up front
+        research_results = dict(preliminary_research or {})
+        pending_topics = [t for t in research_topics if t not in research_results]
+        if pending_topics:
+            research_results.update(await self._tavily_research(pending_topics))
+        
+        # Analyze research results
+        research_prompt = _RESEARCH_TMPL.format(
+            research=_compact(research_results),
+            understanding=_compact(understanding)
+        )
+        
+        model = self._model_for("research_analysis")
+        response = await _acall_gemini(research_prompt, model)
         
-        model = self.ai_config._get_cached_model("brief_analysis") or "gemini-1.5-pro-latest"
-        response = _call_gemini_api(analysis_prompt, model)
+        try:
+            return _parse_json(response)
+        except ValueError as e:
+            logger.warning(f"Failed to parse research analysis: {e}")
+            return {"research_topics": research_topics, "raw_results": research_results}
+    
+    async def _tavily_research(self, topics: List[str]) -> Dict[str, Any]:
+        """
+        Perform research using Tavily API
+        """
+        return await tavily_client.search(topics)
+    
+    async def _formulate_strategy(
+        self, 
+        understanding: Dict[str, Any], 
+        research: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Step 3: Formulate content strategy based on understanding and research
+        """
+        strategy_prompt = _STRATEGY_TMPL.format(
+            understanding=_compact(understanding),
+            research=_compact(research)
+        )
+        
+        model = self._model_for("strategy_formulation")
+        response = await _acall_gemini(strategy_prompt, model)
         
         try:
-            analysis = json.loads(response)
+            return _parse_json(response)
+        except ValueError as e:
+            logger.warning(f"Failed to parse strategy: {e}")
+            return {"error": "Failed to parse strategy", "raw": response}
+    
+    async def _generate_creative_content(
+        self, 
+        strategy: Dict[str, Any], 
+        original_context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Step 4: Generate creative content based on strategy
+        """
+        # Extract content requirements
+        blog_quota = original_context.get("content_plan", {}).get("blog_posts_quota", 5)
+        topics_to_generate = blog_quota + 3  # Generate extra for selection
+        
+        organization = original_context.get("organization", {})
+        creative_prompt = _CREATIVE_TMPL.format(
+            topics_to_generate=topics_to_generate,
+            strategy=_compact(strategy),
+            organization=organization.get("name", "Unknown"),
+            industry=organization.get("industry", "Unknown"),
+            key_topics=_compact(original_context.get("brief_insights", {}).get("key_topics", [])),
+            style=_compact(original_context.get("communication_strategy", {}).get("general_style", {}))
+        )
+        
+        model = self._model_for("creative_generation")
+        
+        # Stop generating once enough topics have been decoded
+        topics = await _stream_array_items(creative_prompt, model, topics_to_generate)
+        if topics:
+            return {"topics": topics, "count": len(topics)}
+        
+        response = await _acall_gemini(creative_prompt, model)
+        
+        try:
+            topics = _parse_json(response)
+            return {"topics": topics, "count": len(topics)}
+        except ValueError as e:
+            logger.warning(f"Failed to parse creative output: {e}")
+            return {"error": "Failed to parse creative output", "raw": response}
+    
+    async def _evaluate_and_refine(
+        self, 
+        creative_output: Dict[str, Any], 
+        context: Dict[str, Any],
+        context_cache: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Step 5: Evaluate and refine the generated content
+        """
+        if "error" in creative_output:
+            return creative_output
+            
+        topics = creative_output.get("topics", [])
+        
+        topics_blob = _compact(topics)
+        evaluation_prompt = _EVALUATION_TMPL.format(
+            topics=topics_blob,
+            brief_requirements=_compact(context.get("brief_insights", {}))
+        )
+        # With the context cached, brief requirements come from its brief_insights
+        instruction = _EVALUATION_TMPL.format(
+            topics=topics_blob,
+            brief_requirements='See "brief_insights" in the context above.'
+        )
+        
+        model = self._model_for("evaluation")
+        response = await _acall_gemini(evaluation_prompt, model, context_cache, instruction)
+        
+        try:
+            evaluation_result = _parse_json(response)
+        except ValueError as e:
+            logger.warning(f"Failed to parse evaluation: {e}")
+            return topics  # Return original if evaluation fails
+        
+        if not isinstance(evaluation_result, dict):
+            return topics
+        return evaluation_result.get("refined_topics", topics)
+
+
+class EnhancedBriefAnalyzer:
+    """
+    Advanced brief analyzer using multi-layered analysis
+    """
+    
+    def __init__(
+        self, 
+        db: Session,
+        ai_config: Optional[AIConfigService] = None,
+        prompt_manager: Optional[PromptManager] = None
+    ):
+        self.db = db
+        self.reasoning_engine = DeepReasoningEngine(db, ai_config, prompt_manager)
+        
+    async def analyze_brief(
+        self, 
+        brief_text: str, 
+        organization_context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Perform deep analysis of content brief
+        """
+        analysis_prompt = _BRIEF_ANALYSIS_TMPL.format(
+            brief=brief_text[:8000],
+            organization=_compact(organization_context)
+        )
+        
+        self.reasoning_engine._resolve_models()
+        model = self.reasoning_engine._model_for("brief_analysis")
+        response = await _acall_gemini(analysis_prompt, model)
+        
+        try:
+            analysis = _parse_json(response)
             
             # Enhance with research if key topics found
             if analysis.get("core_topics"):
@@ -490,6 +981,49 @@ Provide detailed JSON analysis with confidence scores for each extraction.
         }
 
 
+# Industry insights are shared across requests and workers via the context cache
+INDUSTRY_INSIGHTS_TTL_HOURS = 24
+
+# Per-industry locks so concurrent requests fetch an industry once.
+# asyncio locks are loop-bound and Celery tasks run on short-lived loops,
+# so locks are kept per event loop.
+_industry_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Only the beginning of a company page is analyzed
+WEBSITE_MAX_BYTES = 64 * 1024
+WEBSITE_PREVIEW_CHARS = 5000
+
+
+async def _read_capped(response: aiohttp.ClientResponse, limit: int = WEBSITE_MAX_BYTES) -> str:
+    """Read at most `limit` bytes of the body and decode them leniently"""
+    chunks, size = [], 0
+    async for chunk in response.content.iter_chunked(16 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    raw = b"".join(chunks)[:limit]
+    return raw.decode(response.charset or "utf-8", errors="replace")
+
+
+def _html_to_text(html: str) -> str:
+    """Visible page text, so the preview carries content rather than markup"""
+    if BeautifulSoup is None:
+        return html
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(["script", "style", "noscript", "svg"]):
+        tag.decompose()
+    return " ".join(soup.get_text(separator=" ").split())
+
+
+def _industry_lock(industry: str) -> asyncio.Lock:
+    locks = _industry_locks.setdefault(asyncio.get_running_loop(), defaultdict(asyncio.Lock))
+    return locks[industry]
+
+
 class IndustryKnowledgeBase:
     """
     Build and maintain industry-specific knowledge
@@ -497,7 +1031,6 @@ class IndustryKnowledgeBase:
     
     def __init__(self, db: Session):
         self.db = db
-        self.cache = {}
         
     async def analyze_company_website(self, website_url: str) -> Dict[str, Any]:
         """
@@ -508,33 +1041,22 @@ class IndustryKnowledgeBase:
             
         try:
             # Fetch website content
-            async with aiohttp.ClientSession() as session:
-                async with session.get(website_url, timeout=10) as response:
-                    if response.status == 200:
-                        html_content = await response.text()
+            session = await get_session()
+            async with session.get(website_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    html_content = await _read_capped(response)
                         
             # Extract and analyze
-            analysis_prompt = f"""
-Analyze this company website to understand their business:
-
-Website URL: {website_url}
-Content Preview: {html_content[:5000]}
-
-Extract:
-1. Industry/Sector
-2. Main products/services
-3. Target market
-4. Company values/mission
-5. Key differentiators
-6. Content tone/style from existing content
-
-Format as JSON.
-"""
+            page_text = await asyncio.to_thread(_html_to_text, html_content)
+            analysis_prompt = _WEBSITE_TMPL.format(
+                url=website_url, 
+                content=page_text[:WEBSITE_PREVIEW_CHARS]
+            )
             
             model = "gemini-1.5-pro-latest"
-            response = _call_gemini_api(analysis_prompt, model)
+            response = await _acall_gemini(analysis_prompt, model)
             
-            return json.loads(response)
+            return _parse_json(response)
             
         except Exception as e:
             logger.error(f"Website analysis error: {e}")
@@ -544,12 +1066,21 @@ Format as JSON.
         """
         Get industry-specific insights for content generation
         """
-        if industry in self.cache:
-            return self.cache[industry]
+        cache_key = ["industry_insights", industry]
+        insights = get_cached_context(cache_key)
+        if insights is not None:
+            return insights
+        
+        async with _industry_lock(industry):
+            # Filled by another request while we were waiting
+            insights = get_cached_context(cache_key)
+            if insights is not None:
+                return insights
             
-        insights = await self._fetch_industry_insights(industry)
-        self.cache[industry] = insights
-        return insights
+            insights = await self._fetch_industry_insights(industry)
+            if not (isinstance(insights, dict) and insights.get("basic_insights")):  # failure fallback
+                set_cached_context(cache_key, insights, ttl_hours=INDUSTRY_INSIGHTS_TTL_HOURS)
+            return insights
         
     async def _fetch_industry_insights(self, industry: str) -> Dict[str, Any]:
         """
@@ -563,31 +1094,16 @@ Format as JSON.
             f"{industry} thought leadership"
         ]
         
-        engine = DeepReasoningEngine(self.db)
-        research_results = await engine._tavily_research(research_queries)
+        research_results = await tavily_client.search(research_queries)
         
         # Synthesize insights
-        synthesis_prompt = f"""
-Synthesize industry insights from research:
-
-Industry: {industry}
-Research Data: {json.dumps(research_results, ensure_ascii=False, indent=2)}
-
-Provide:
-1. Top content themes in this industry
-2. Audience preferences
-3. Successful content formats
-4. Industry-specific terminology
-5. Compliance considerations
-6. Seasonal patterns
-
-Format as actionable JSON insights for content generation.
-"""
+        synthesis_prompt = _INDUSTRY_TMPL.format(industry=industry, research=_compact(research_results))
         
         model = "gemini-1.5-pro-latest"
-        response = _call_gemini_api(synthesis_prompt, model)
+        response = await _acall_gemini(synthesis_prompt, model)
         
         try:
-            return json.loads(response)
-        except:
+            return _parse_json(response)
+        except ValueError as e:
+            logger.warning(f"Failed to parse industry insights: {e}")
             return {"industry": industry, "basic_insights": True}
\ No newline at end of file
@@ -1,4 +1,6 @@
-from fastapi import Depends, HTTPException, status
+import logging
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.db.database import get_db
@@ -7,14 +9,20 @@ from app.core.security import verify_token
 from app.core.prompt_manager import PromptManager
 from app.core.ai_config_service import AIConfigService
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
 
 def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> models.User:
     """Get current authenticated user"""
-    print(f"[DEBUG] Received credentials: {credentials.credentials[:50]}..." if credentials.credentials else "No credentials")
+    # Already resolved for this request
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
     
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -23,19 +31,18 @@ def get_current_user(
     )
     
     username = verify_token(credentials.credentials)
-    print(f"[DEBUG] Verified username: {username}")
     
     if username is None:
-        print("[DEBUG] Token verification failed")
+        logger.debug("Token verification failed")
         raise credentials_exception
     
     user = crud.user_crud.get_by_username(db, username)
-    print(f"[DEBUG] Found user: {user.username if user else 'None'}")
     
     if user is None:
-        print("[DEBUG] User not found in database")
+        logger.debug("User %s not found in database", username)
         raise credentials_exception
     
+    request.state.user = user
     return user
 
 def get_current_active_user(
@@ -49,26 +56,66 @@ def get_current_active_user(
         )
     return current_user
 
+def _get_organization_with_access(
+    request: Request,
+    db: Session,
+    org_id: int,
+    user_id: int
+) -> tuple:
+    """Organization with the user's (member, owner) flags, loaded once per request"""
+    cache = getattr(request.state, "organization_access", None)
+    if cache is None:
+        cache = request.state.organization_access = {}
+    key = (org_id, user_id)
+    if key not in cache:
+        cache[key] = crud.organization_crud.get_with_access(db, org_id, user_id)
+    
+    found = cache[key]
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Organization not found"
+        )
+    return found
+
 def get_organization_access(
     org_id: int,
+    request: Request,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> models.Organization:
     """Check if user has access to organization"""
-    organization = crud.organization_crud.get_by_id(db, org_id)
-    if not organization:
+    organization, is_member, _ = _get_organization_with_access(request, db, org_id, current_user.id)
+    
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return organization
+
+
+def get_owned_plan_id(
+    plan_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> int:
+    """Check if content plan exists and belongs to one of user's organizations"""
+    organization_id = crud.content_plan_crud.get_organization_id(db, plan_id)
+    if organization_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Organization not found"
+            detail="Content plan not found"
         )
     
-    if not crud.organization_crud.user_has_access(db, org_id, current_user.id):
+    if not any(org.id == organization_id for org in current_user.organizations):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
+            detail="Access forbidden"
         )
     
-    return organization
+    return plan_id
 
 
 # AI System Dependencies
@@ -83,24 +130,24 @@ def get_prompt_manager(db: Session = Depends(get_db)) -> PromptManager:
 def get_ai_config_service(db: Session = Depends(get_db)) -> AIConfigService:
     """
     Dependency provider dla AIConfigService.
-    Tworzy instancję AIConfigService z aktualną sesją bazy danych.
+    Tworzy instancję AIConfigService z aktualną sesją bazy danych
+    i pobiera od razu wszystkie przypisania modeli jednym zapytaniem
+    (synchronicznie - FastAPI uruchamia tę zależność w puli wątków).
     """
-    return AIConfigService(db_session=db)
+    ai_config_service = AIConfigService(db_session=db)
+    ai_config_service.prefetch_all()
+    return ai_config_service
 
 def require_organization_owner(
     org_id: int,
+    request: Request,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> models.Organization:
     """Check if user is organization owner"""
-    organization = crud.organization_crud.get_by_id(db, org_id)
-    if not organization:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Organization not found"
-        )
+    organization, _, is_owner = _get_organization_with_access(request, db, org_id, current_user.id)
     
-    if organization.owner_id != current_user.id:
+    if not is_owner:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only organization owner can perform this action"
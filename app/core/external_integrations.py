@@ -6,15 +6,418 @@ Provides unified interface for Tavily, RAGFlow, and other external services.
 
 import os
 import json
+import random
 import logging
+import re
+import time
+import weakref
 import aiohttp
 import asyncio
-from typing import Dict, Any, List, Optional
+import orjson
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
-from tavily import TavilyClient
+from urllib.parse import urlparse
+from cachetools import TTLCache
+from app.core.ai_service import GeminiAI
+from app.core.http_client import get_session
+from app.core.tavily_client import TAVILY_SEARCH_URL
 
 logger = logging.getLogger(__name__)
 
+# Service configuration, read from the environment once at import
+_TAVILY_API_KEY = os.getenv('TAVILY_API_KEY')
+_RAGFLOW_API_URL = os.getenv('RAGFLOW_API_URL', 'http://localhost:9380')
+_RAGFLOW_API_KEY = os.getenv('RAGFLOW_API_KEY')
+_RAGFLOW_KB_ID = os.getenv('RAGFLOW_KB_ID')
+_MCP_ENABLED = os.getenv('MCP_ENABLED', 'false').lower() == 'true'
+_MCP_TAVILY_SERVER_URL = os.getenv('MCP_TAVILY_SERVER_URL')
+_MCP_RAGFLOW_SERVER_URL = os.getenv('MCP_RAGFLOW_SERVER_URL')
+
+# Theme extraction is skipped for search results with less content than this
+THEMES_MIN_CHARS = 500
+
+# Search result categories - whole words in titles ("newsletter" is not news),
+# any occurrence in URLs ("/blog/", "articles")
+_NEWS_TITLE_RE = re.compile(r"\b(?:news|breaking|updates?)\b", re.IGNORECASE)
+_GUIDE_TITLE_RE = re.compile(r"\b(?:guides?|how to|tutorials?)\b", re.IGNORECASE)
+_RESEARCH_TITLE_RE = re.compile(r"\b(?:research|study|studies|reports?)\b", re.IGNORECASE)
+_ARTICLE_URL_RE = re.compile(r"blog|article", re.IGNORECASE)
+
+# Words ignored by theme extraction
+STOPWORDS = frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"})
+
+# Keyword groups for industry and audience detection
+INDUSTRY_KEYWORDS = {
+    "technology": ["software", "IT", "tech", "digital", "cloud", "SaaS"],
+    "elektryka": ["elektryczne", "elektryka", "instalacje", "electrical", "automation"],
+    "marketing": ["marketing", "advertising", "brand", "media"],
+    "finance": ["financial", "banking", "investment", "fintech"],
+    "healthcare": ["health", "medical", "healthcare", "pharma"],
+    "education": ["education", "learning", "training", "academic"],
+    "retail": ["retail", "store", "shopping", "commerce"],
+    "manufacturing": ["manufacturing", "production", "factory", "industrial"]
+}
+
+AUDIENCE_KEYWORDS = {
+    "B2B": ["enterprise", "business", "company", "organization", "corporate"],
+    "B2C": ["consumer", "customer", "individual", "personal", "user"],
+    "SME": ["small business", "SME", "startup", "entrepreneur"],
+    "Enterprise": ["enterprise", "large organization", "corporation"]
+}
+
+# Sentence filters for service, value and competitor extraction (substring, case-insensitive)
+_SERVICE_MENTION_RE = re.compile(r"service|product", re.IGNORECASE)
+_SERVICE_LINE_RE = re.compile(r"service|offer|provide|solution", re.IGNORECASE)
+_SERVICE_SENTENCE_RE = re.compile(r"service|product|solution", re.IGNORECASE)
+_VALUE_RE = re.compile(r"mission|vision|value|believe|commitment|dedicated", re.IGNORECASE)
+# Word directly before a comparison word ("Acme vs ...") within one sentence
+_COMPARISON_RE = re.compile(
+    r"(?<![^\s.])([^\s.]+)\s+(?=(?:vs|versus|alternative|competitor)(?![^\s.]))",
+    re.IGNORECASE
+)
+
+
+# Website analysis prompt (double braces are literal JSON braces)
+_WEBSITE_ANALYSIS_PROMPT = """
+You are an expert business analyst specializing in company analysis and content strategy. 
+Analyze the following information about the company and provide a comprehensive, detailed analysis.
+
+Company Website: {website_url}
+Company Name: {organization_name}
+
+{combined_text}
+
+Based on this information, provide a DETAILED and SPECIFIC analysis in JSON format with the following structure:
+
+{{
+    "company_overview": "Comprehensive 2-3 sentence overview of what the company does, their main value proposition, and market position",
+
+    "industry": "Specific industry classification (be precise - e.g., 'B2B SaaS for HR Management' not just 'technology' or 'business')",
+
+    "services": [
+        "List of specific services/products offered (be detailed, e.g., 'Cloud-based employee onboarding platform' not just 'software')",
+        "Include at least 3-5 specific services if available"
+    ],
+
+    "values": [
+        "Core company values and principles (extract from mission/vision statements)",
+        "Include specific values mentioned on the website"
+    ],
+
+    "target_audience": [
+        "Primary target audience segments (be specific, e.g., 'Mid-size tech companies with 50-500 employees')",
+        "Include multiple segments if applicable"
+    ],
+
+
+    "key_topics": [
+        "Main content topics and themes the company focuses on",
+        "Include specific topics from their blog/content if available"
+    ],
+
+    "unique_selling_points": [
+        "What makes this company unique compared to competitors",
+        "Specific differentiators and competitive advantages"
+    ],
+
+    "content_strategy_insights": "Analysis of their current content strategy - what types of content they create, how often, what channels they use, what seems to work well",
+
+    "recommended_content_topics": [
+        "Suggested content topics that would resonate with their audience",
+        "Based on industry trends and gaps in their current content"
+    ],
+
+    "brand_personality": "Detailed description of the brand's personality traits (e.g., 'Innovative, trustworthy, customer-centric, data-driven')",
+
+    "key_differentiators": [
+        "Specific features or approaches that differentiate them from competitors",
+        "Include technological, service, or business model differentiators"
+    ],
+
+    "competitors": [
+        "List of potential competitors mentioned or implied"
+    ],
+
+    "market_positioning": "How the company positions itself in the market (leader, challenger, niche player, etc.)",
+
+    "customer_pain_points": [
+        "Key problems the company solves for customers",
+        "Pain points addressed by their solutions"
+    ],
+
+    "technology_stack": [
+        "Technologies or platforms mentioned (if applicable)"
+    ],
+
+    "partnership_ecosystem": [
+        "Key partners, integrations, or ecosystem relationships mentioned"
+    ]
+}}
+
+IMPORTANT INSTRUCTIONS:
+1. Be SPECIFIC and DETAILED - avoid generic terms like "business", "informative", "professional"
+2. Extract real information from the provided text, don't make assumptions
+3. If information is not available for a field, use null or empty array
+4. Focus on actionable insights that would help generate targeted content
+5. Ensure the analysis is relevant for content generation and marketing purposes
+6. Return ONLY valid JSON, no additional text or explanations
+"""
+
+# Search context budget for the website analysis prompt. No tokenizer is bundled,
+# so tokens are approximated as 4 characters; shares are per prompt section.
+ANALYSIS_CONTEXT_TOKENS = 4000
+CHARS_PER_TOKEN = 4
+_SECTION_SHARES = {"company": 0.40, "industry": 0.15, "values": 0.15, "content": 0.30}
+
+
+def _fit_to_budget(texts: List[str], budget: int) -> List[str]:
+    """
+    Truncate texts so their total length fits the character budget
+    
+    Short texts are kept whole and the space they leave is shared by the
+    longer ones (max-min fair), so nothing is cut below its fair share.
+    """
+    allowed = [0] * len(texts)
+    remaining = budget
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    for position, index in enumerate(order):
+        share = remaining // (len(texts) - position)
+        allowed[index] = min(len(texts[index]), share)
+        remaining -= allowed[index]
+    return [text[:limit] for text, limit in zip(texts, allowed)]
+
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_START_RE = re.compile(r"\{")
+
+
+def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode the first JSON object embedded in text (markdown fences or prose around it)
+    
+    Raises:
+        json.JSONDecodeError: when braces are present but none starts a valid object
+    """
+    error = None
+    for match in _JSON_START_RE.finditer(text):
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, match.start())
+        except json.JSONDecodeError as e:
+            error = error or e
+            continue
+        if isinstance(obj, dict):
+            return obj
+    if error is not None:
+        raise error
+    return None
+
+
+class _KeywordMatcher:
+    """
+    Find which keywords of each group occur in a text in a single regex pass
+    
+    Equivalent to checking `keyword in text` for every keyword: the lookahead
+    reports the longest keyword starting at each position, and keywords
+    contained in a match are credited with it.
+    """
+    
+    def __init__(self, groups: Dict[Any, List[str]]):
+        self.groups = groups
+        keywords = sorted({kw for kws in groups.values() for kw in kws}, key=len, reverse=True)
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+        self._contained = {
+            kw: [other for other in keywords if other in kw]
+            for kw in keywords
+        }
+    
+    def found(self, text: str) -> Dict[Any, int]:
+        """Number of distinct keywords found per group (groups without matches omitted)"""
+        present = set()
+        for match in set(self._pattern.findall(text)):
+            present.update(self._contained[match])
+        counts = {}
+        for group, kws in self.groups.items():
+            count = sum(1 for kw in kws if kw in present)
+            if count:
+                counts[group] = count
+        return counts
+
+
+# Industry and audience keywords in one matcher, groups tagged ("industry" | "audience", name)
+_CLASSIFIER = _KeywordMatcher({
+    **{("industry", name): kws for name, kws in INDUSTRY_KEYWORDS.items()},
+    **{("audience", name): kws for name, kws in AUDIENCE_KEYWORDS.items()}
+})
+
+# Tavily search results cache - bounded, entries expire after a day (monotonic clock,
+# so lookups compare floats and wall-clock jumps cannot expire entries early)
+TAVILY_CACHE_SIZE = 1024
+TAVILY_CACHE_TTL_SECONDS = 24 * 3600.0
+
+
+# check_tavily_status result memo (shared by all instances): (result, expires_at monotonic)
+TAVILY_STATUS_OK_TTL = 60.0
+TAVILY_STATUS_ERROR_TTL = 10.0
+_tavily_status: Optional[Tuple[Dict[str, Any], float]] = None
+
+
+class TavilyAPIError(Exception):
+    """Non-200 response (or timeout) from the Tavily REST API"""
+    
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[str] = None):
+        super().__init__(f"{status}: {message}" if status else message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+# Adaptive (AIMD) concurrency for Tavily calls: +0.5 slot after a healthy sample
+# window, halved on throttling or server errors; plus a 60 s requests-per-minute window
+TAVILY_CONCURRENCY_INITIAL = 4
+TAVILY_CONCURRENCY_MIN = 1
+TAVILY_CONCURRENCY_MAX = 32
+TAVILY_RPM_LIMIT = 100
+TAVILY_TARGET_LATENCY = 5.0
+TAVILY_LATENCY_SAMPLES = 10
+_THROTTLE_MARKERS = ("429", "too many requests", "rate limit", "usage limit", "502", "503", "504")
+
+
+class _AIMDLimiter:
+    """
+    Admission control for Tavily calls (one instance per event loop)
+    """
+    
+    def __init__(self):
+        self.limit = float(TAVILY_CONCURRENCY_INITIAL)
+        self._active = 0
+        self._condition = asyncio.Condition()
+        self._sent: deque = deque()
+        self._latencies: List[float] = []
+        self._blocked_until = 0.0
+    
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < int(self.limit))
+            self._active += 1
+        try:
+            await self._wait_if_throttled()
+        except BaseException:
+            await self.release()
+            raise
+    
+    async def release(self) -> None:
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+    
+    async def _wait_if_throttled(self) -> None:
+        """Honour retry-after and the requests-per-minute window"""
+        while True:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] >= 60:
+                self._sent.popleft()
+            delay = self._blocked_until - now
+            if len(self._sent) >= TAVILY_RPM_LIMIT:
+                delay = max(delay, self._sent[0] + 60 - now)
+            if delay <= 0:
+                self._sent.append(now)
+                return
+            await asyncio.sleep(delay)
+    
+    def record_success(self, latency: float) -> None:
+        self._latencies.append(latency)
+        if len(self._latencies) < TAVILY_LATENCY_SAMPLES:
+            return
+        if sum(self._latencies) / len(self._latencies) <= TAVILY_TARGET_LATENCY:
+            self.limit = min(TAVILY_CONCURRENCY_MAX, self.limit + 0.5)
+        self._latencies.clear()
+    
+    def record_failure(self, error: Exception) -> None:
+        message = str(error).lower()
+        if not any(marker in message for marker in _THROTTLE_MARKERS):
+            return
+        self.limit = max(TAVILY_CONCURRENCY_MIN, self.limit * 0.5)
+        self._latencies.clear()
+        retry_after = _retry_after(error)
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        logger.warning(f"Tavily throttling detected, concurrency limit lowered to {int(self.limit)}")
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Retry-After (seconds) sent with a Tavily error, if present"""
+    try:
+        return float(getattr(error, "retry_after", None) or 0) or None
+    except (TypeError, ValueError):
+        return None
+
+
+_tavily_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AIMDLimiter]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _tavily_limiter() -> _AIMDLimiter:
+    """Limiter for the running loop (asyncio primitives are loop-bound)"""
+    loop = asyncio.get_running_loop()
+    limiter = _tavily_limiters.get(loop)
+    if limiter is None:
+        limiter = _tavily_limiters[loop] = _AIMDLimiter()
+    return limiter
+
+
+async def _error_detail(response: aiohttp.ClientResponse) -> str:
+    """Error message from a Tavily error response ({"detail": {"error": ...}})"""
+    try:
+        detail = (await response.json(content_type=None)).get("detail")
+    except (aiohttp.ContentTypeError, ValueError, AttributeError):
+        return response.reason or "Tavily API error"
+    if isinstance(detail, dict):
+        detail = detail.get("error")
+    return str(detail or response.reason or "Tavily API error")
+
+
+async def _coalesced(
+    inflight: Dict[Any, asyncio.Future],
+    key: Any,
+    call: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Single-flight: concurrent callers with the same key share one call's result
+    
+    `inflight` must belong to a single event loop (futures are loop-bound).
+    If the leading caller is cancelled, its followers retry the call instead
+    of inheriting the cancellation.
+    """
+    while True:
+        existing = inflight.get(key)
+        if existing is None:
+            break
+        try:
+            return await asyncio.shield(existing)
+        except asyncio.CancelledError:
+            # The shared future is only cancelled when the leader was; our own
+            # cancellation leaves it pending (shield) and is propagated
+            if not existing.cancelled():
+                raise
+    
+    future = asyncio.get_running_loop().create_future()
+    inflight[key] = future
+    try:
+        result = await call()
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        # Mark retrieved so an unawaited future does not log a warning
+        future.exception()
+        raise
+    finally:
+        del inflight[key]
+
 
 class TavilyIntegration:
     """
@@ -22,11 +425,56 @@ class TavilyIntegration:
     """
     
     def __init__(self):
-        self.api_key = os.getenv('TAVILY_API_KEY')
-        self.client = TavilyClient(api_key=self.api_key) if self.api_key else None
-        self.cache = {}
-        self.cache_ttl = timedelta(hours=24)
+        self.api_key = _TAVILY_API_KEY
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self.cache: TTLCache = TTLCache(
+            maxsize=TAVILY_CACHE_SIZE,
+            ttl=TAVILY_CACHE_TTL_SECONDS,
+            timer=time.monotonic
+        )
+        # Searches in progress, keyed like the cache - concurrent duplicates await one call
+        self._inflight: Dict[tuple, asyncio.Future] = {}
         
+    async def _call_client(self, query: str, **options) -> Dict[str, Any]:
+        """
+        POST a search to the Tavily REST API under adaptive admission control
+        
+        Raises:
+            TavilyAPIError: on a non-200 response or timeout
+        """
+        payload = {"query": query, **options}
+        for key in ("include_domains", "exclude_domains"):
+            payload[key] = list(payload.get(key) or [])
+        
+        limiter = _tavily_limiter()
+        await limiter.acquire()
+        try:
+            started = time.monotonic()
+            try:
+                session = await get_session()
+                async with session.post(TAVILY_SEARCH_URL, data=orjson.dumps(payload), headers=self._headers) as response:
+                    if response.status != 200:
+                        raise TavilyAPIError(
+                            await _error_detail(response),
+                            status=response.status,
+                            retry_after=response.headers.get("Retry-After")
+                        )
+                    data = orjson.loads(await response.read())
+            except asyncio.TimeoutError:
+                error = TavilyAPIError("Tavily request timed out")
+                limiter.record_failure(error)
+                raise error
+            except Exception as e:
+                limiter.record_failure(e)
+                raise
+            limiter.record_success(time.monotonic() - started)
+            return data
+        finally:
+            await limiter.release()
+    
     async def check_tavily_status(self) -> Dict[str, Any]:
         """
         Check if Tavily API is working and has available quota
@@ -34,75 +482,91 @@ class TavilyIntegration:
         Returns:
             Dict with status or error information
         """
-        if not self.client:
+        global _tavily_status
+        if not self.api_key:
             return {"error": "Tavily API key not configured"}
         
+        # Status changes slowly - reuse a recent result (errors only briefly)
+        if _tavily_status is not None and time.monotonic() < _tavily_status[1]:
+            return dict(_tavily_status[0])
+        
         try:
             # Try a minimal search to check API status
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.search(
-                    "test",
-                    search_depth="basic",
-                    max_results=1
-                )
+            await self._call_client(
+                "test",
+                search_depth="basic",
+                max_results=1
             )
-            return {"status": "ok"}
+            status, ttl = {"status": "ok"}, TAVILY_STATUS_OK_TTL
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Tavily status check failed: {error_msg}")
-            return {"error": error_msg}
+            status, ttl = {"error": error_msg}, TAVILY_STATUS_ERROR_TTL
+        
+        _tavily_status = (status, time.monotonic() + ttl)
+        return status
     
     async def search(
         self, 
         query: str, 
         search_depth: str = "advanced",
         max_results: int = 5,
-        include_domains: List[str] = None,
-        exclude_domains: List[str] = None
+        include_domains: Sequence[str] = (),
+        exclude_domains: Sequence[str] = ()
     ) -> Dict[str, Any]:
         """
         Perform advanced search using Tavily API
         """
-        if not self.client:
+        if not self.api_key:
             logger.warning("Tavily API key not configured")
             return {"error": "API key not configured"}
         
+        # Domain filters as tuples - hashable, so they are part of the cache key
+        include_domains = tuple(include_domains or ())
+        exclude_domains = tuple(exclude_domains or ())
+        
         # Check cache
-        cache_key = f"{query}_{search_depth}_{max_results}"
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if datetime.now() - timestamp < self.cache_ttl:
-                logger.info(f"Using cached Tavily results for: {query}")
-                return cached_data
+        cache_key = (query.lower().strip(), search_depth, max_results, include_domains, exclude_domains)
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            logger.info(f"Using cached Tavily results for: {query}")
+            return cached_data
+        
+        async def fetch() -> Dict[str, Any]:
+            result = await self._run_search(
+                query, search_depth, max_results, include_domains, exclude_domains
+            )
+            if "error" not in result:
+                self.cache[cache_key] = result
+            return result
         
+        return await _coalesced(self._inflight, cache_key, fetch)
+    
+    async def _run_search(
+        self,
+        query: str,
+        search_depth: str,
+        max_results: int,
+        include_domains: Tuple[str, ...],
+        exclude_domains: Tuple[str, ...]
+    ) -> Dict[str, Any]:
+        """
+        Call the Tavily API and enhance the results (no caching)
+        """
         try:
-            # Use the official Tavily client in a thread pool
-            loop = asyncio.get_event_loop()
-            
-            # Run the sync method in executor
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.search(
-                    query,
-                    search_depth=search_depth,
-                    max_results=max_results,
-                    include_answer=True,
-                    include_raw_content=False,
-                    include_images=True,
-                    include_domains=include_domains,
-                    exclude_domains=exclude_domains
-                )
+            response = await self._call_client(
+                query,
+                search_depth=search_depth,
+                max_results=max_results,
+                include_answer=True,
+                include_raw_content=False,
+                include_images=True,
+                include_domains=include_domains,
+                exclude_domains=exclude_domains
             )
             
             # Process and enhance results
-            enhanced_data = self._enhance_search_results(response)
-            
-            # Cache results
-            self.cache[cache_key] = (enhanced_data, datetime.now())
-            
-            return enhanced_data
+            return self._enhance_search_results(response)
                         
         except Exception as e:
             logger.error(f"Tavily search error: {e}")
@@ -143,20 +607,26 @@ class TavilyIntegration:
         """
         Analyze competitor content and strategies
         """
+        if not self.api_key:
+            logger.warning("Tavily API key not configured")
+            return {}
+        
         if not aspects:
             aspects = ["content marketing", "blog topics", "social media"]
         
         competitor_insights = {}
         
-        for aspect in aspects:
-            query = f"{industry} {aspect} best practices examples -site:{company_name}.com"
-            
-            results = await self.search(
-                query=query,
+        # Run all aspect searches concurrently
+        aspect_results = await asyncio.gather(*[
+            self.search(
+                query=f"{industry} {aspect} best practices examples -site:{company_name}.com",
                 search_depth="advanced",
                 max_results=10
             )
-            
+            for aspect in aspects
+        ])
+        
+        for aspect, results in zip(aspects, aspect_results):
             if "error" not in results:
                 competitor_insights[aspect] = {
                     "key_insights": results.get("answer", ""),
@@ -187,7 +657,7 @@ class TavilyIntegration:
         Returns:
             Dict with comprehensive website analysis
         """
-        if not self.client:
+        if not self.api_key:
             logger.warning("Tavily API key not configured")
             return {"error": "API key not configured"}
         
@@ -197,7 +667,6 @@ class TavilyIntegration:
                 website_url = f"https://{website_url}"
             
             # Extract domain for targeted search
-            from urllib.parse import urlparse
             parsed_url = urlparse(website_url)
             domain = parsed_url.netloc.replace('www.', '')
             
@@ -224,39 +693,48 @@ class TavilyIntegration:
             if organization_name:
                 company_query = f"{organization_name} {company_query}"
             
-            company_results = await self.search(
-                query=company_query,
-                search_depth="advanced",
-                max_results=10,
-                include_domains=[domain]
-            )
-            
             # 2. Search for industry and market position
             industry_query = f"site:{domain} industry sector market solutions"
-            industry_results = await self.search(
-                query=industry_query,
-                search_depth="basic",
-                max_results=5,
-                include_domains=[domain]
-            )
             
             # 3. Search for company values and mission
             values_query = f"site:{domain} mission values vision culture team"
-            values_results = await self.search(
-                query=values_query,
-                search_depth="basic",
-                max_results=5,
-                include_domains=[domain]
-            )
             
             # 4. Analyze content and blog if exists
             content_query = f"site:{domain} blog news articles insights"
-            content_results = await self.search(
-                query=content_query,
-                search_depth="basic",
-                max_results=10,
-                include_domains=[domain]
+            
+            # Run the four searches concurrently
+            domain_filter = (domain,)
+            searches = await asyncio.gather(
+                self.search(
+                    query=company_query,
+                    search_depth="advanced",
+                    max_results=10,
+                    include_domains=domain_filter
+                ),
+                self.search(
+                    query=industry_query,
+                    search_depth="basic",
+                    max_results=5,
+                    include_domains=domain_filter
+                ),
+                self.search(
+                    query=values_query,
+                    search_depth="basic",
+                    max_results=5,
+                    include_domains=domain_filter
+                ),
+                self.search(
+                    query=content_query,
+                    search_depth="basic",
+                    max_results=10,
+                    include_domains=domain_filter
+                ),
+                return_exceptions=True
             )
+            company_results, industry_results, values_results, content_results = [
+                {"error": str(r)} if isinstance(r, BaseException) else r
+                for r in searches
+            ]
             
             # Collect all raw data for AI processing
             raw_data = {
@@ -272,6 +750,24 @@ class TavilyIntegration:
             # Process with AI for deep analysis
             ai_analysis = await self._process_with_ai(raw_data)
             
+            # Basic keyword extraction is only the fallback when AI analysis failed
+            # (each extractor lowercases and scans the search texts)
+            if not ai_analysis:
+                industry, audiences = self._classify_all(" ".join([
+                    company_results.get("answer", ""),
+                    industry_results.get("answer", ""),
+                    content_results.get("answer", "")
+                ]))
+                ai_analysis = {
+                    "company_overview": company_results.get("answer", ""),
+                    "services": self._extract_services(company_results),
+                    "industry": industry,
+                    "values": self._extract_values(values_results),
+                    "target_audience": audiences,
+                    "key_topics": self._extract_key_topics(content_results),
+                    "competitors": self._find_competitor_mentions(company_results, industry_results)
+                }
+            
             # Combine AI analysis with basic extraction
             analysis_results = {
                 "website_url": website_url,
@@ -279,13 +775,13 @@ class TavilyIntegration:
                 "analysis_timestamp": datetime.now().isoformat(),
                 
                 # AI-enhanced analysis
-                "company_overview": ai_analysis.get("company_overview", company_results.get("answer", "")),
-                "services_detected": ai_analysis.get("services", self._extract_services(company_results)),
-                "industry_detected": ai_analysis.get("industry", self._detect_industry(company_results, industry_results)),
-                "company_values": ai_analysis.get("values", self._extract_values(values_results)),
-                "target_audience": ai_analysis.get("target_audience", self._analyze_target_audience(company_results, content_results)),
-                "key_topics": ai_analysis.get("key_topics", self._extract_key_topics(content_results)),
-                "competitors_mentioned": ai_analysis.get("competitors", self._find_competitor_mentions(company_results, industry_results)),
+                "company_overview": ai_analysis["company_overview"],
+                "services_detected": ai_analysis["services"],
+                "industry_detected": ai_analysis["industry"],
+                "company_values": ai_analysis["values"],
+                "target_audience": ai_analysis["target_audience"],
+                "key_topics": ai_analysis["key_topics"],
+                "competitors_mentioned": ai_analysis["competitors"],
                 
                 # Additional AI insights
                 "unique_selling_points": ai_analysis.get("unique_selling_points", []),
@@ -316,56 +812,43 @@ class TavilyIntegration:
         
         # From AI answer
         answer = search_results.get("answer", "")
-        if "service" in answer.lower() or "product" in answer.lower():
+        if _SERVICE_MENTION_RE.search(answer):
             # Simple extraction - can be enhanced with NLP
-            lines = answer.split('.')
-            for line in lines:
-                if any(word in line.lower() for word in ["service", "offer", "provide", "solution"]):
+            for line in answer.split('.'):
+                if _SERVICE_LINE_RE.search(line):
                     services.append(line.strip())
         
         # From search results
         for result in search_results.get("results", [])[:5]:
             content = result.get("content", "")
-            if "service" in content.lower() or "product" in content.lower():
+            if _SERVICE_MENTION_RE.search(content):
                 # Extract sentences mentioning services
-                sentences = content.split('.')[:3]
-                for sentence in sentences:
-                    if any(word in sentence.lower() for word in ["service", "product", "solution"]):
+                for sentence in content.split('.')[:3]:
+                    if _SERVICE_SENTENCE_RE.search(sentence):
                         services.append(sentence.strip())
         
-        # Deduplicate and limit
-        return list(set(services))[:10]
+        # Deduplicate (keeping first-seen order) and limit
+        return list(dict.fromkeys(services))[:10]
     
-    def _detect_industry(self, company_results: Dict, industry_results: Dict) -> str:
-        """Detect industry from search results"""
-        industry_keywords = {}
-        
-        # Common industry indicators
-        industries = {
-            "technology": ["software", "IT", "tech", "digital", "cloud", "SaaS"],
-            "elektryka": ["elektryczne", "elektryka", "instalacje", "electrical", "automation"],
-            "marketing": ["marketing", "advertising", "brand", "media"],
-            "finance": ["financial", "banking", "investment", "fintech"],
-            "healthcare": ["health", "medical", "healthcare", "pharma"],
-            "education": ["education", "learning", "training", "academic"],
-            "retail": ["retail", "store", "shopping", "commerce"],
-            "manufacturing": ["manufacturing", "production", "factory", "industrial"]
-        }
-        
-        # Analyze all text
-        all_text = (company_results.get("answer", "") + " " + 
-                   industry_results.get("answer", "")).lower()
-        
-        for industry, keywords in industries.items():
-            count = sum(1 for keyword in keywords if keyword in all_text)
-            if count > 0:
-                industry_keywords[industry] = count
+    def _classify_all(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Detect industry and target audience types in a single keyword scan
         
-        # Return most mentioned industry
-        if industry_keywords:
-            return max(industry_keywords, key=industry_keywords.get)
+        Returns:
+            (most mentioned industry or "business", audience types in declaration order)
+        """
+        found = _CLASSIFIER.found(text.lower())
+        industry_keywords = {name: count for (kind, name), count in found.items() if kind == "industry"}
+        audiences = [name for kind, name in found if kind == "audience"]
         
-        return "business"
+        # Most mentioned industry
+        industry = max(industry_keywords, key=industry_keywords.get) if industry_keywords else "business"
+        return industry, audiences
+    
+    def _detect_industry(self, company_results: Dict, industry_results: Dict) -> str:
+        """Detect industry from search results"""
+        all_text = company_results.get("answer", "") + " " + industry_results.get("answer", "")
+        return self._classify_all(all_text)[0]
     
     def _extract_values(self, values_results: Dict) -> List[str]:
         """Extract company values from search results"""
@@ -374,34 +857,16 @@ class TavilyIntegration:
         answer = values_results.get("answer", "")
         if answer:
             # Look for value-related keywords
-            value_keywords = ["mission", "vision", "value", "believe", "commitment", "dedicated"]
-            sentences = answer.split('.')
-            for sentence in sentences:
-                if any(keyword in sentence.lower() for keyword in value_keywords):
+            for sentence in answer.split('.'):
+                if _VALUE_RE.search(sentence):
                     values.append(sentence.strip())
         
         return values[:5]
     
     def _analyze_target_audience(self, company_results: Dict, content_results: Dict) -> List[str]:
         """Analyze target audience from content"""
-        audiences = []
-        
-        # Audience indicators
-        audience_keywords = {
-            "B2B": ["enterprise", "business", "company", "organization", "corporate"],
-            "B2C": ["consumer", "customer", "individual", "personal", "user"],
-            "SME": ["small business", "SME", "startup", "entrepreneur"],
-            "Enterprise": ["enterprise", "large organization", "corporation"]
-        }
-        
-        all_text = (company_results.get("answer", "") + " " + 
-                   content_results.get("answer", "")).lower()
-        
-        for audience_type, keywords in audience_keywords.items():
-            if any(keyword in all_text for keyword in keywords):
-                audiences.append(audience_type)
-        
-        return audiences
+        all_text = company_results.get("answer", "") + " " + content_results.get("answer", "")
+        return self._classify_all(all_text)[1]
     
     
     def _extract_key_topics(self, content_results: Dict) -> List[str]:
@@ -420,24 +885,17 @@ class TavilyIntegration:
         """Find mentions of competitors"""
         competitors = []
         
-        # Look for comparison keywords
-        comparison_keywords = ["vs", "versus", "compared to", "alternative", "competitor"]
-        
         all_text = (company_results.get("answer", "") + " " + 
                    industry_results.get("answer", ""))
         
-        sentences = all_text.split('.')
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in comparison_keywords):
-                # Extract potential competitor names (simple approach)
-                words = sentence.split()
-                for i, word in enumerate(words):
-                    if word.lower() in comparison_keywords and i > 0:
-                        potential_competitor = words[i-1]
-                        if len(potential_competitor) > 2 and potential_competitor[0].isupper():
-                            competitors.append(potential_competitor)
-        
-        return list(set(competitors))[:5]
+        # Extract potential competitor names (simple approach): the word
+        # right before "vs", "versus", "alternative" or "competitor"
+        for match in _COMPARISON_RE.finditer(all_text):
+            potential_competitor = match.group(1)
+            if len(potential_competitor) > 2 and potential_competitor[0].isupper():
+                competitors.append(potential_competitor)
+        
+        return list(dict.fromkeys(competitors))[:5]
     
     async def _process_with_ai(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -450,9 +908,6 @@ class TavilyIntegration:
             Dict with AI-enhanced analysis
         """
         try:
-            # Import Gemini AI module
-            from app.core.ai_service import GeminiAI
-            
             # Initialize AI service
             ai_service = GeminiAI()
             
@@ -462,109 +917,32 @@ class TavilyIntegration:
             values_info = raw_data.get("values_results", {})
             content_info = raw_data.get("content_results", {})
             
-            # Combine all search results into a comprehensive text
-            combined_text = f"""
-            COMPANY INFORMATION:
-            {company_info.get('answer', '')}
-            
-            SEARCH RESULTS:
-            {' '.join([r.get('content', '')[:500] for r in company_info.get('results', [])[:5]])}
-            
-            INDUSTRY CONTEXT:
-            {industry_info.get('answer', '')}
-            
-            VALUES AND MISSION:
-            {values_info.get('answer', '')}
+            # Combine all search results into a comprehensive text, each section
+            # truncated to its share of the context budget
+            budget = ANALYSIS_CONTEXT_TOKENS * CHARS_PER_TOKEN
+            company_texts = _fit_to_budget(
+                [company_info.get('answer') or ''] + [r.get('content') or '' for r in company_info.get('results', [])[:5]],
+                int(budget * _SECTION_SHARES["company"])
+            )
+            industry_texts = _fit_to_budget([industry_info.get('answer') or ''], int(budget * _SECTION_SHARES["industry"]))
+            values_texts = _fit_to_budget([values_info.get('answer') or ''], int(budget * _SECTION_SHARES["values"]))
+            content_texts = _fit_to_budget(
+                [(r.get('title') or '') + ': ' + (r.get('content') or '') for r in content_info.get('results', [])[:5]],
+                int(budget * _SECTION_SHARES["content"])
+            )
             
-            CONTENT SAMPLES:
-            {' '.join([r.get('title', '') + ': ' + r.get('content', '')[:300] for r in content_info.get('results', [])[:5]])}
-            """
+            parts = ["COMPANY INFORMATION:\n", company_texts[0], "\n\nSEARCH RESULTS:\n", ' '.join(company_texts[1:])]
+            parts += ["\n\nINDUSTRY CONTEXT:\n", industry_texts[0]]
+            parts += ["\n\nVALUES AND MISSION:\n", values_texts[0]]
+            parts += ["\n\nCONTENT SAMPLES:\n", ' '.join(content_texts)]
+            combined_text = "".join(parts)
             
             # Create detailed prompt for AI analysis
-            analysis_prompt = f"""
-            You are an expert business analyst specializing in company analysis and content strategy. 
-            Analyze the following information about the company and provide a comprehensive, detailed analysis.
-            
-            Company Website: {raw_data.get('website_url', '')}
-            Company Name: {raw_data.get('organization_name', 'Unknown')}
-            
-            {combined_text}
-            
-            Based on this information, provide a DETAILED and SPECIFIC analysis in JSON format with the following structure:
-            
-            {{
-                "company_overview": "Comprehensive 2-3 sentence overview of what the company does, their main value proposition, and market position",
-                
-                "industry": "Specific industry classification (be precise - e.g., 'B2B SaaS for HR Management' not just 'technology' or 'business')",
-                
-                "services": [
-                    "List of specific services/products offered (be detailed, e.g., 'Cloud-based employee onboarding platform' not just 'software')",
-                    "Include at least 3-5 specific services if available"
-                ],
-                
-                "values": [
-                    "Core company values and principles (extract from mission/vision statements)",
-                    "Include specific values mentioned on the website"
-                ],
-                
-                "target_audience": [
-                    "Primary target audience segments (be specific, e.g., 'Mid-size tech companies with 50-500 employees')",
-                    "Include multiple segments if applicable"
-                ],
-                
-                
-                "key_topics": [
-                    "Main content topics and themes the company focuses on",
-                    "Include specific topics from their blog/content if available"
-                ],
-                
-                "unique_selling_points": [
-                    "What makes this company unique compared to competitors",
-                    "Specific differentiators and competitive advantages"
-                ],
-                
-                "content_strategy_insights": "Analysis of their current content strategy - what types of content they create, how often, what channels they use, what seems to work well",
-                
-                "recommended_content_topics": [
-                    "Suggested content topics that would resonate with their audience",
-                    "Based on industry trends and gaps in their current content"
-                ],
-                
-                "brand_personality": "Detailed description of the brand's personality traits (e.g., 'Innovative, trustworthy, customer-centric, data-driven')",
-                
-                "key_differentiators": [
-                    "Specific features or approaches that differentiate them from competitors",
-                    "Include technological, service, or business model differentiators"
-                ],
-                
-                "competitors": [
-                    "List of potential competitors mentioned or implied"
-                ],
-                
-                "market_positioning": "How the company positions itself in the market (leader, challenger, niche player, etc.)",
-                
-                "customer_pain_points": [
-                    "Key problems the company solves for customers",
-                    "Pain points addressed by their solutions"
-                ],
-                
-                "technology_stack": [
-                    "Technologies or platforms mentioned (if applicable)"
-                ],
-                
-                "partnership_ecosystem": [
-                    "Key partners, integrations, or ecosystem relationships mentioned"
-                ]
-            }}
-            
-            IMPORTANT INSTRUCTIONS:
-            1. Be SPECIFIC and DETAILED - avoid generic terms like "business", "informative", "professional"
-            2. Extract real information from the provided text, don't make assumptions
-            3. If information is not available for a field, use null or empty array
-            4. Focus on actionable insights that would help generate targeted content
-            5. Ensure the analysis is relevant for content generation and marketing purposes
-            6. Return ONLY valid JSON, no additional text or explanations
-            """
+            analysis_prompt = _WEBSITE_ANALYSIS_PROMPT.format(
+                website_url=raw_data.get('website_url', ''),
+                organization_name=raw_data.get('organization_name', 'Unknown'),
+                combined_text=combined_text
+            )
             
             # Get AI analysis
             response = await ai_service.generate_content(
@@ -573,16 +951,10 @@ class TavilyIntegration:
                 max_tokens=2000
             )
             
-            # Parse AI response
-            import json
-            import re
-            
-            # Extract JSON from response (in case AI adds extra text)
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                try:
-                    ai_analysis = json.loads(json_match.group())
-                    
+            # Parse AI response - extract JSON (in case AI adds extra text)
+            try:
+                ai_analysis = _extract_json_object(response)
+                if ai_analysis is not None:
                     # Validate and clean the analysis
                     cleaned_analysis = {
                         "company_overview": ai_analysis.get("company_overview", ""),
@@ -606,13 +978,12 @@ class TavilyIntegration:
                     
                     logger.info(f"AI analysis completed successfully for {raw_data.get('website_url', 'unknown')}")
                     return cleaned_analysis
-                    
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse AI response as JSON: {e}")
-                    logger.debug(f"AI response: {response}")
-            else:
+                
                 logger.error("No JSON found in AI response")
                 logger.debug(f"AI response: {response}")
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse AI response as JSON: {e}")
+                logger.debug(f"AI response: {response}")
             
             # Return empty analysis if AI processing fails
             return {}
@@ -629,22 +1000,24 @@ class TavilyIntegration:
         if "results" not in data:
             return data
         
-        # Extract key themes
-        all_content = " ".join([
-            r.get("content", "") for r in data["results"]
-        ])
+        results = data["results"] or []
+        contents = [r.get("content") or "" for r in results]
         
-        themes = self._extract_themes(all_content)
+        # Extract key themes - not worth it for empty or tiny result sets
+        if sum(map(len, contents)) < THEMES_MIN_CHARS:
+            themes = []
+        else:
+            themes = self._extract_themes(" ".join(contents))
         
         # Categorize results
-        categorized = self._categorize_results(data["results"])
+        categorized = self._categorize_results(results)
         
         return {
             **data,
             "themes": themes,
             "categorized_results": categorized,
             "summary": data.get("answer", ""),
-            "total_results": len(data["results"])
+            "total_results": len(results)
         }
     
     def _extract_themes(self, content: str) -> List[str]:
@@ -652,20 +1025,13 @@ class TavilyIntegration:
         Extract main themes from content
         """
         # Simple theme extraction - in production, use NLP
-        words = content.lower().split()
-        word_freq = {}
-        
-        stopwords = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"}
-        
-        for word in words:
-            if len(word) > 4 and word not in stopwords:
-                word_freq[word] = word_freq.get(word, 0) + 1
+        word_freq = Counter(
+            word for word in content.lower().split()
+            if len(word) > 4 and word not in STOPWORDS
+        )
         
         # Get top themes
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        themes = [word[0] for word in sorted_words[:10]]
-        
-        return themes
+        return [word for word, _ in word_freq.most_common(10)]
     
     def _categorize_results(self, results: List[Dict]) -> Dict[str, List]:
         """
@@ -680,16 +1046,16 @@ class TavilyIntegration:
         }
         
         for result in results:
-            title = result.get("title", "").lower()
-            url = result.get("url", "").lower()
+            title = result.get("title") or ""
+            url = result.get("url") or ""
             
-            if any(word in title for word in ["news", "breaking", "update"]):
+            if _NEWS_TITLE_RE.search(title):
                 categories["news"].append(result)
-            elif any(word in title for word in ["guide", "how to", "tutorial"]):
+            elif _GUIDE_TITLE_RE.search(title):
                 categories["guides"].append(result)
-            elif any(word in title for word in ["research", "study", "report"]):
+            elif _RESEARCH_TITLE_RE.search(title):
                 categories["research"].append(result)
-            elif any(word in url for word in ["blog", "article"]):
+            elif _ARTICLE_URL_RE.search(url):
                 categories["articles"].append(result)
             else:
                 categories["other"].append(result)
@@ -717,15 +1083,92 @@ class TavilyIntegration:
         return recent
 
 
+# RAGFlow search results - repeated queries (orchestrator and topic research) are
+# answered in-process; cleared whenever a document is added to the knowledge base
+RAG_CACHE_SIZE = 1024
+RAG_CACHE_TTL_SECONDS = 3600.0
+_rag_cache: TTLCache = TTLCache(maxsize=RAG_CACHE_SIZE, ttl=RAG_CACHE_TTL_SECONDS, timer=time.monotonic)
+
+
+# Transient upstream failures (RAGFlow, MCP) are retried with jittered exponential backoff
+HTTP_RETRY_ATTEMPTS = 3
+HTTP_RETRY_BASE_DELAY = 0.2
+HTTP_RETRY_STATUSES = frozenset({502, 503, 504})
+
+# Request timeouts (RAGFlow search, document adds, MCP tool calls)
+_SEARCH_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5)
+_ADD_TIMEOUT = aiohttp.ClientTimeout(total=300, connect=5)
+_MCP_TIMEOUT = aiohttp.ClientTimeout(total=300, connect=5)
+
+
+async def _post_with_retry(
+    url: str,
+    payload: Any,
+    *,
+    idempotent: bool = True,
+    max_attempts: int = HTTP_RETRY_ATTEMPTS,
+    base_delay: float = HTTP_RETRY_BASE_DELAY,
+    **kwargs
+) -> Tuple[int, Any]:
+    """
+    POST a JSON payload (orjson-encoded) over the shared session, retrying transient failures
+    
+    Idempotent calls are retried on 502/503/504 and dropped connections;
+    others only when the connection could not be established (nothing was sent).
+    4xx responses are never retried.
+    
+    Returns:
+        (status, decoded JSON body for 200/201 or None)
+    """
+    body = orjson.dumps(payload, default=str)
+    session = await get_session()
+    for attempt in range(max_attempts):
+        last_attempt = attempt == max_attempts - 1
+        try:
+            async with session.post(url, data=body, **kwargs) as response:
+                if not (idempotent and response.status in HTTP_RETRY_STATUSES and not last_attempt):
+                    data = orjson.loads(await response.read()) if response.status in (200, 201) else None
+                    return response.status, data
+                logger.warning(f"Retrying POST {url} after HTTP {response.status}")
+        except aiohttp.ClientConnectorError as e:
+            if last_attempt:
+                raise
+            logger.warning(f"Retrying POST {url} after connection error: {e}")
+        except aiohttp.ServerDisconnectedError as e:
+            if last_attempt or not idempotent:
+                raise
+            logger.warning(f"Retrying POST {url} after disconnect: {e}")
+        await asyncio.sleep(base_delay * 2 ** attempt + random.random() * 0.1)
+
+
+# Document adds arriving within the window are sent as one batch request
+RAG_BATCH_WINDOW_SECONDS = 0.05
+RAG_BATCH_MAX_DOCUMENTS = 64
+
+
+def _rag_cache_key(kb_id: Optional[str], query: str, top_k: int, filters: Optional[Dict[str, Any]]) -> tuple:
+    """Cache key: normalized query (case, whitespace) plus search parameters"""
+    normalized = " ".join(query.lower().split())
+    canonical_filters = orjson.dumps(filters, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str) if filters else b""
+    return (kb_id, normalized, top_k, canonical_filters)
+
+
 class RAGFlowIntegration:
     """
     RAGFlow integration for knowledge base and content retrieval
     """
     
     def __init__(self):
-        self.base_url = os.getenv('RAGFLOW_API_URL', 'http://localhost:9380')
-        self.api_key = os.getenv('RAGFLOW_API_KEY')
-        self.knowledge_base_id = os.getenv('RAGFLOW_KB_ID')
+        self.base_url = _RAGFLOW_API_URL
+        self.api_key = _RAGFLOW_API_KEY
+        self.knowledge_base_id = _RAGFLOW_KB_ID
+        # Searches in progress - concurrent identical queries share one request
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # Pending document adds (document, future) and the task flushing them
+        self._add_queue: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._add_flusher: Optional[asyncio.Task] = None
+        # Switched off when the server has no batch endpoint (404/405)
+        self._batch_supported = True
         
     async def search_knowledge_base(
         self,
@@ -740,12 +1183,29 @@ class RAGFlowIntegration:
             logger.warning("RAGFlow not configured")
             return {"error": "RAGFlow not configured"}
         
+        cache_key = _rag_cache_key(self.knowledge_base_id, query, top_k, filters)
+        cached = _rag_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Using cached RAGFlow results for: {query[:80]}")
+            return cached
+        
+        return await _coalesced(
+            self._inflight,
+            cache_key,
+            lambda: self._search_remote(query, top_k, filters, cache_key)
+        )
+    
+    async def _search_remote(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        cache_key: tuple
+    ) -> Dict[str, Any]:
+        """
+        POST the search to RAGFlow and cache a successful result
+        """
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "query": query,
                 "top_k": top_k,
@@ -755,19 +1215,18 @@ class RAGFlowIntegration:
             if filters:
                 payload["filters"] = filters
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/api/v1/search",
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._process_rag_results(data)
-                    else:
-                        logger.error(f"RAGFlow API error: {response.status}")
-                        return {"error": f"API error: {response.status}"}
+            status, data = await _post_with_retry(
+                f"{self.base_url}/api/v1/search", payload,
+                headers=self._headers(),
+                timeout=_SEARCH_TIMEOUT
+            )
+            if status == 200:
+                result = self._process_rag_results(data)
+                _rag_cache[cache_key] = result
+                return result
+            else:
+                logger.error(f"RAGFlow API error: {status}")
+                return {"error": f"API error: {status}"}
                         
         except Exception as e:
             logger.error(f"RAGFlow search error: {e}")
@@ -781,37 +1240,111 @@ class RAGFlowIntegration:
     ) -> Dict[str, Any]:
         """
         Add content to RAGFlow knowledge base
+        
+        Adds arriving within a short window are sent together in one batch request.
         """
         if not self.api_key:
             return {"error": "RAGFlow not configured"}
         
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
+        document = {
+            "content": content,
+            "metadata": {
+                **metadata,
+                "document_type": document_type,
+                "indexed_at": datetime.now().isoformat()
             }
+        }
+        
+        if not self._batch_supported:
+            return await self._add_single(document)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._add_queue.append((document, future))
+        if self._add_flusher is None or self._add_flusher.done():
+            self._add_flusher = asyncio.create_task(self._flush_adds())
+        return await future
+    
+    async def _flush_adds(self) -> None:
+        """
+        Send queued documents after the batching window, up to the batch size per request
+        """
+        await asyncio.sleep(RAG_BATCH_WINDOW_SECONDS)
+        while self._add_queue:
+            batch = self._add_queue[:RAG_BATCH_MAX_DOCUMENTS]
+            del self._add_queue[:RAG_BATCH_MAX_DOCUMENTS]
+            documents = [document for document, _ in batch]
+            try:
+                if len(documents) == 1 or not self._batch_supported:
+                    results = await asyncio.gather(*[self._add_single(d) for d in documents])
+                else:
+                    results = await self._add_batch(documents)
+            except Exception as e:
+                logger.error(f"RAGFlow add document error: {e}")
+                results = [{"error": str(e)}] * len(batch)
             
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+    
+    def _headers(self) -> Dict[str, str]:
+        """Request headers for the RAGFlow API"""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    async def _add_batch(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add several documents in one request; falls back to single adds without a batch endpoint
+        """
+        payload = {
+            "kb_id": self.knowledge_base_id,
+            "documents": documents
+        }
+        
+        status, data = await _post_with_retry(
+            f"{self.base_url}/api/v1/documents:batch", payload,
+            idempotent=False,
+            headers=self._headers(),
+            timeout=_ADD_TIMEOUT
+        )
+        if status in [404, 405]:
+            logger.info("RAGFlow batch endpoint not available, adding documents one by one")
+            self._batch_supported = False
+            return await asyncio.gather(*[self._add_single(d) for d in documents])
+        if status not in [200, 201]:
+            return [{"error": f"Failed to add document: {status}"}] * len(documents)
+        
+        # New documents may change any cached search result
+        _rag_cache.clear()
+        added = data.get("documents") or []
+        return [
+            {"success": True, "document_id": added[i].get("id") if i < len(added) else None}
+            for i in range(len(documents))
+        ]
+    
+    async def _add_single(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add one document to the knowledge base
+        """
+        try:
             payload = {
                 "kb_id": self.knowledge_base_id,
-                "content": content,
-                "metadata": {
-                    **metadata,
-                    "document_type": document_type,
-                    "indexed_at": datetime.now().isoformat()
-                }
+                **document
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/api/v1/documents",
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    if response.status in [200, 201]:
-                        data = await response.json()
-                        return {"success": True, "document_id": data.get("id")}
-                    else:
-                        return {"error": f"Failed to add document: {response.status}"}
+            status, data = await _post_with_retry(
+                f"{self.base_url}/api/v1/documents", payload,
+                idempotent=False,
+                headers=self._headers(),
+                timeout=_ADD_TIMEOUT
+            )
+            if status in [200, 201]:
+                # New document may change any cached search result
+                _rag_cache.clear()
+                return {"success": True, "document_id": data.get("id")}
+            else:
+                return {"error": f"Failed to add document: {status}"}
                         
         except Exception as e:
             logger.error(f"RAGFlow add document error: {e}")
@@ -842,15 +1375,13 @@ class RAGFlowIntegration:
         documents = data.get("documents", [])
         
         # Group by document type
-        grouped = {}
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
         for doc in documents:
-            doc_type = doc.get("metadata", {}).get("document_type", "unknown")
-            if doc_type not in grouped:
-                grouped[doc_type] = []
-            grouped[doc_type].append({
+            metadata = doc.get("metadata") or {}
+            grouped.setdefault(metadata.get("document_type", "unknown"), []).append({
                 "content": doc.get("content", ""),
                 "score": doc.get("score", 0),
-                "metadata": doc.get("metadata", {})
+                "metadata": metadata
             })
         
         return {
@@ -860,6 +1391,76 @@ class RAGFlowIntegration:
         }
 
 
+async def _tagged(tag: str, call: Awaitable[Any]) -> Tuple[str, Any]:
+    """Await `call` and return it with its tag (exceptions returned, as with gather)"""
+    try:
+        return tag, await call
+    except Exception as e:
+        return tag, e
+
+
+# Failed sources reported as {"error": ...}; the others degrade to {}
+_REPORTED_SOURCE_ERRORS = frozenset({"web_search", "recent_news"})
+
+# Results of sources that are not queried (service not configured or not applicable),
+# matching what the skipped call would have returned; also fixes the key order
+_SKIPPED_SOURCE_RESULTS = {
+    "web_search": {"error": "API key not configured"},
+    "recent_news": {"error": "API key not configured"},
+    "competitor_insights": {},
+    "knowledge_base": {"error": "RAGFlow not configured"}
+}
+
+
+def _empty_synthesis() -> Dict[str, Any]:
+    return {
+        "key_findings": [],
+        "content_opportunities": [],
+        "trending_angles": [],
+        "recommended_topics": []
+    }
+
+
+def _fold_into_synthesis(synthesis: Dict[str, Any], source: str, data: Any) -> None:
+    """
+    Add the insights of one research source to `synthesis`
+    
+    Each source feeds its own list, so sources can be folded in any order.
+    """
+    if not isinstance(data, dict):
+        return
+    
+    if source == "web_search":
+        # Key findings from web search
+        if "themes" in data:
+            synthesis["key_findings"].extend(data["themes"][:5])
+    
+    elif source == "recent_news":
+        # Trending topics from news
+        if "filtered_news" in data:
+            for news in data["filtered_news"][:3]:
+                synthesis["trending_angles"].append(news.get("title", ""))
+    
+    elif source == "competitor_insights":
+        # Competitor strategies
+        for aspect, insights in data.items():
+            if isinstance(insights, dict) and "examples" in insights:
+                for example in insights["examples"][:2]:
+                    synthesis["content_opportunities"].append({
+                        "aspect": aspect,
+                        "inspiration": example.get("title", ""),
+                        "url": example.get("url", "")
+                    })
+    
+    elif source == "knowledge_base":
+        # Knowledge base insights
+        if "top_result" in data and data["top_result"]:
+            synthesis["recommended_topics"].append({
+                "source": "knowledge_base",
+                "content": data["top_result"].get("content", "")[:200]
+            })
+
+
 class ContentResearchOrchestrator:
     """
     Orchestrates multiple research sources for comprehensive insights
@@ -878,58 +1479,37 @@ class ContentResearchOrchestrator:
         """
         Perform comprehensive research using all available sources
         """
-        research_tasks = []
-        
-        # Tavily research
-        research_tasks.append(
-            self.tavily.search(
-                f"{topic} {organization_context.get('industry', '')}",
-                search_depth="advanced"
-            )
-        )
+        industry = organization_context.get("industry") or ""
+        name = organization_context.get("name")
+        combined_query = f"{topic} {industry}".strip()
+        timestamp = datetime.now().isoformat()
+        
+        # Only configured services are called
+        research: Dict[str, Awaitable[Any]] = {}
+        if self.tavily.api_key:
+            research["web_search"] = self.tavily.search(combined_query, search_depth="advanced")
+            research["recent_news"] = self.tavily.get_news(topic, days=30)
+            # Competitors only for a named organization
+            if name:
+                research["competitor_insights"] = self.tavily.analyze_competitors(name, industry or "business")
+        if self.ragflow.api_key:
+            research["knowledge_base"] = self.ragflow.search_knowledge_base(topic, top_k=10)
         
-        # Industry news
-        research_tasks.append(
-            self.tavily.get_news(
-                topic,
-                days=30
-            )
-        )
-        
-        # Competitor analysis
-        if organization_context.get("name"):
-            research_tasks.append(
-                self.tavily.analyze_competitors(
-                    organization_context["name"],
-                    organization_context.get("industry", "business")
-                )
-            )
-        
-        # RAGFlow knowledge base
-        research_tasks.append(
-            self.ragflow.search_knowledge_base(
-                topic,
-                top_k=10
-            )
-        )
-        
-        # Execute all research in parallel
-        results = await asyncio.gather(*research_tasks, return_exceptions=True)
-        
-        # Process results
         combined_insights = {
             "topic": topic,
-            "timestamp": datetime.now().isoformat(),
-            "sources": {
-                "web_search": results[0] if not isinstance(results[0], Exception) else {"error": str(results[0])},
-                "recent_news": results[1] if not isinstance(results[1], Exception) else {"error": str(results[1])},
-                "competitor_insights": results[2] if len(results) > 2 and not isinstance(results[2], Exception) else {},
-                "knowledge_base": results[3] if len(results) > 3 and not isinstance(results[3], Exception) else {}
-            }
+            "timestamp": timestamp,
+            "sources": {source: dict(result) for source, result in _SKIPPED_SOURCE_RESULTS.items()}
         }
+        synthesis = _empty_synthesis()
+        
+        # Execute all research in parallel, folding each source into the synthesis as it arrives
+        for next_done in asyncio.as_completed([_tagged(source, call) for source, call in research.items()]):
+            source, result = await next_done
+            if isinstance(result, Exception):
+                result = {"error": str(result)} if source in _REPORTED_SOURCE_ERRORS else {}
+            combined_insights["sources"][source] = result
+            _fold_into_synthesis(synthesis, source, result)
         
-        # Synthesize insights
-        synthesis = await self._synthesize_research(combined_insights)
         combined_insights["synthesis"] = synthesis
         
         return combined_insights
@@ -938,43 +1518,9 @@ class ContentResearchOrchestrator:
         """
         Synthesize research findings into actionable insights
         """
-        synthesis = {
-            "key_findings": [],
-            "content_opportunities": [],
-            "trending_angles": [],
-            "recommended_topics": []
-        }
-        
-        # Extract key findings from web search
-        web_data = research_data["sources"].get("web_search", {})
-        if "themes" in web_data:
-            synthesis["key_findings"].extend(web_data["themes"][:5])
-        
-        # Extract trending topics from news
-        news_data = research_data["sources"].get("recent_news", {})
-        if "filtered_news" in news_data:
-            for news in news_data["filtered_news"][:3]:
-                synthesis["trending_angles"].append(news.get("title", ""))
-        
-        # Extract competitor strategies
-        competitor_data = research_data["sources"].get("competitor_insights", {})
-        for aspect, insights in competitor_data.items():
-            if isinstance(insights, dict) and "examples" in insights:
-                for example in insights["examples"][:2]:
-                    synthesis["content_opportunities"].append({
-                        "aspect": aspect,
-                        "inspiration": example.get("title", ""),
-                        "url": example.get("url", "")
-                    })
-        
-        # Knowledge base insights
-        kb_data = research_data["sources"].get("knowledge_base", {})
-        if "top_result" in kb_data and kb_data["top_result"]:
-            synthesis["recommended_topics"].append({
-                "source": "knowledge_base",
-                "content": kb_data["top_result"].get("content", "")[:200]
-            })
-        
+        synthesis = _empty_synthesis()
+        for source, data in research_data["sources"].items():
+            _fold_into_synthesis(synthesis, source, data)
         return synthesis
     
     async def research_topic(
@@ -999,20 +1545,25 @@ class ContentResearchOrchestrator:
             organization_name = context.get("organization_name", "")
             industry = context.get("industry", "")
             
-            # Perform basic search
+            # Basic search and recent news about the topic, concurrently
             search_query = f"{topic} {industry} {datetime.now().year}"
-            results = await self.tavily.search(
-                query=search_query,
-                search_depth="advanced",
-                max_results=10
-            )
-            
-            # Get recent news about the topic
-            news_results = await self.tavily.get_news(
-                topic=topic,
-                days=30,
-                max_results=5
+            results, news_results = await asyncio.gather(
+                self.tavily.search(
+                    query=search_query,
+                    search_depth="advanced",
+                    max_results=10
+                ),
+                self.tavily.get_news(
+                    topic=topic,
+                    days=30,
+                    max_results=5
+                ),
+                return_exceptions=True
             )
+            if isinstance(results, BaseException):
+                results = {"error": str(results)}
+            if isinstance(news_results, BaseException):
+                news_results = {"error": str(news_results)}
             
             # Combine results
             combined_results = {
@@ -1053,9 +1604,11 @@ class MCPIntegration:
     """
     
     def __init__(self):
-        self.mcp_enabled = os.getenv('MCP_ENABLED', 'false').lower() == 'true'
-        self.mcp_tavily_url = os.getenv('MCP_TAVILY_SERVER_URL')
-        self.mcp_ragflow_url = os.getenv('MCP_RAGFLOW_SERVER_URL')
+        self.mcp_enabled = _MCP_ENABLED
+        self.mcp_tavily_url = _MCP_TAVILY_SERVER_URL
+        self.mcp_ragflow_url = _MCP_RAGFLOW_SERVER_URL
+        # Tool calls in progress - concurrent identical calls share one request
+        self._inflight: Dict[tuple, asyncio.Future] = {}
         
     async def call_mcp_tool(
         self,
@@ -1069,6 +1622,22 @@ class MCPIntegration:
         if not self.mcp_enabled:
             return {"error": "MCP not enabled"}
         
+        key = (server_url, tool_name, orjson.dumps(parameters, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str))
+        return await _coalesced(
+            self._inflight,
+            key,
+            lambda: self._post_tool_call(server_url, tool_name, parameters)
+        )
+    
+    async def _post_tool_call(
+        self,
+        server_url: str,
+        tool_name: str,
+        parameters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Send a JSON-RPC tools/call request to the MCP server
+        """
         try:
             payload = {
                 "jsonrpc": "2.0",
@@ -1080,17 +1649,15 @@ class MCPIntegration:
                 "id": 1
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    server_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get("result", {})
-                    else:
-                        return {"error": f"MCP call failed: {response.status}"}
+            status, data = await _post_with_retry(
+                server_url, payload,
+                headers={"Content-Type": "application/json"},
+                timeout=_MCP_TIMEOUT
+            )
+            if status == 200:
+                return data.get("result", {})
+            else:
+                return {"error": f"MCP call failed: {status}"}
                         
         except Exception as e:
             logger.error(f"MCP call error: {e}")
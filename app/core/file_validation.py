@@ -1,6 +1,5 @@
 from fastapi import HTTPException, UploadFile
-from typing import List, Optional
-import magic
+from typing import AbstractSet, Optional, Tuple
 import os
 
 # File size limits (in bytes)
@@ -8,16 +7,16 @@ MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB default
 MAX_IMAGE_SIZE = 5 * 1024 * 1024   # 5 MB for images
 MAX_DOCUMENT_SIZE = 20 * 1024 * 1024  # 20 MB for documents
 
-# Allowed MIME types
-ALLOWED_IMAGE_TYPES = [
+# Allowed MIME types (frozensets - O(1) membership, built once)
+ALLOWED_IMAGE_TYPES = frozenset({
     "image/jpeg",
     "image/png",
     "image/gif",
     "image/webp",
     "image/svg+xml"
-]
+})
 
-ALLOWED_DOCUMENT_TYPES = [
+ALLOWED_DOCUMENT_TYPES = frozenset({
     "application/pdf",
     "application/msword",
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
@@ -27,21 +26,115 @@ ALLOWED_DOCUMENT_TYPES = [
     "application/vnd.openxmlformats-officedocument.presentationml.presentation",
     "text/plain",
     "text/csv"
-]
+})
+
+ALLOWED_ALL_TYPES = ALLOWED_IMAGE_TYPES | ALLOWED_DOCUMENT_TYPES
+
+_IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"})
+_DOCUMENT_EXTENSIONS = frozenset({".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".txt", ".csv"})
 
 ALLOWED_EXTENSIONS = {
-    "image": [".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"],
-    "document": [".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".txt", ".csv"],
-    "all": [".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".pdf", ".doc", ".docx", 
-            ".xls", ".xlsx", ".ppt", ".pptx", ".txt", ".csv"]
+    "image": _IMAGE_EXTENSIONS,
+    "document": _DOCUMENT_EXTENSIONS,
+    "all": _IMAGE_EXTENSIONS | _DOCUMENT_EXTENSIONS
 }
 
+# Magic numbers of the allowed binary formats - checked before falling back to libmagic
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+)
+
+# Office Open XML documents are ZIP archives; the part directory tells them apart
+_OOXML_PARTS = (
+    (b"word/", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    (b"xl/", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    (b"ppt/", "application/vnd.openxmlformats-officedocument.presentationml.presentation"),
+)
+
+
+def detect_mime(header: bytes) -> Optional[str]:
+    """
+    Detect the MIME type of the allowed formats from the file header
+    
+    Args:
+        header: First bytes of the file (2 KB)
+        
+    Returns:
+        MIME type, or None when libmagic has to decide (legacy Office, text, unknown)
+    """
+    for signature, mime in _SIGNATURES:
+        if header.startswith(signature):
+            return mime
+    
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    
+    if header.startswith(b"PK\x03\x04"):
+        for part, mime in _OOXML_PARTS:
+            if part in header:
+                return mime
+        return None
+    
+    text = header.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in text):
+        return "image/svg+xml"
+    
+    return None
+
 
 class FileValidator:
     """
     Validates uploaded files for size, type, and content
     """
     
+    @staticmethod
+    def _read_size_and_header(file: UploadFile) -> Tuple[int, bytes]:
+        """
+        Read file size and header (2 KB) in one seek sequence, leaving the pointer at the start
+        """
+        file.file.seek(0, 2)  # Seek to end
+        file_size = file.file.tell()
+        file.file.seek(0)
+        file_header = file.file.read(2048)
+        file.file.seek(0)  # Reset to beginning
+        return file_size, file_header
+    
+    @staticmethod
+    def _check_size(file_size: int, max_size: int) -> None:
+        """
+        Raise 413 if the (already measured) file size exceeds max_size
+        """
+        if file_size > max_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {max_size / 1024 / 1024:.1f} MB"
+            )
+    
+    @staticmethod
+    def _check_mime(file_header: bytes, allowed_types: AbstractSet[str]) -> str:
+        """
+        Detect the MIME type from the (already read) header and raise 400 if it is not allowed
+        
+        Returns:
+            Detected MIME type
+        """
+        mime = detect_mime(file_header)
+        if mime is None:
+            # libmagic only for formats the signature table leaves undecided
+            import magic
+            mime = magic.from_buffer(file_header, mime=True)
+        
+        if mime not in allowed_types:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File content type not allowed. Detected: {mime}"
+            )
+        return mime
+    
     @staticmethod
     def validate_file_size(file: UploadFile, max_size: int = MAX_FILE_SIZE) -> None:
         """
@@ -54,25 +147,20 @@ class FileValidator:
         Raises:
             HTTPException: If file is too large
         """
-        # Read file to get size (this loads it into memory)
         file.file.seek(0, 2)  # Seek to end
         file_size = file.file.tell()
         file.file.seek(0)  # Reset to beginning
         
-        if file_size > max_size:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large. Maximum size is {max_size / 1024 / 1024:.1f} MB"
-            )
+        FileValidator._check_size(file_size, max_size)
     
     @staticmethod
-    def validate_file_extension(filename: str, allowed_extensions: List[str]) -> None:
+    def validate_file_extension(filename: str, allowed_extensions: AbstractSet[str]) -> None:
         """
         Validate file extension
         
         Args:
             filename: Name of the file
-            allowed_extensions: List of allowed extensions
+            allowed_extensions: Set of allowed extensions
             
         Raises:
             HTTPException: If extension is not allowed
@@ -81,17 +169,17 @@ class FileValidator:
         if ext not in allowed_extensions:
             raise HTTPException(
                 status_code=400,
-                detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
+                detail=f"File type not allowed. Allowed types: {', '.join(sorted(allowed_extensions))}"
             )
     
     @staticmethod
-    def validate_mime_type(file: UploadFile, allowed_types: List[str]) -> None:
+    def validate_mime_type(file: UploadFile, allowed_types: AbstractSet[str]) -> None:
         """
-        Validate file MIME type using python-magic
+        Validate file MIME type (signature table, python-magic as fallback)
         
         Args:
             file: Uploaded file
-            allowed_types: List of allowed MIME types
+            allowed_types: Set of allowed MIME types
             
         Raises:
             HTTPException: If MIME type is not allowed
@@ -100,47 +188,75 @@ class FileValidator:
         file_header = file.file.read(2048)
         file.file.seek(0)  # Reset file pointer
         
-        # Detect MIME type
-        mime = magic.from_buffer(file_header, mime=True)
+        FileValidator._check_mime(file_header, allowed_types)
+    
+    @staticmethod
+    def validate_all(
+        file: UploadFile,
+        max_size: int,
+        allowed_extensions: AbstractSet[str],
+        allowed_types: AbstractSet[str]
+    ) -> str:
+        """
+        Validate size, extension and MIME type in a single pass over the file
         
-        if mime not in allowed_types:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File content type not allowed. Detected: {mime}"
-            )
+        Args:
+            file: Uploaded file
+            max_size: Maximum allowed size in bytes
+            allowed_extensions: Set of allowed extensions
+            allowed_types: Set of allowed MIME types
+            
+        Returns:
+            Detected MIME type (so callers need not sniff the file again)
+            
+        Raises:
+            HTTPException: If validation fails
+        """
+        # Size and header from one seek sequence
+        file_size, file_header = FileValidator._read_size_and_header(file)
+        
+        FileValidator._check_size(file_size, max_size)
+        FileValidator.validate_file_extension(file.filename, allowed_extensions)
+        return FileValidator._check_mime(file_header, allowed_types)
     
     @staticmethod
-    def validate_image(file: UploadFile) -> None:
+    def validate_image(file: UploadFile) -> str:
         """
         Validate image file
         
         Args:
             file: Uploaded file
             
+        Returns:
+            Detected MIME type
+            
         Raises:
             HTTPException: If validation fails
         """
-        FileValidator.validate_file_size(file, MAX_IMAGE_SIZE)
-        FileValidator.validate_file_extension(file.filename, ALLOWED_EXTENSIONS["image"])
-        FileValidator.validate_mime_type(file, ALLOWED_IMAGE_TYPES)
+        return FileValidator.validate_all(
+            file, MAX_IMAGE_SIZE, ALLOWED_EXTENSIONS["image"], ALLOWED_IMAGE_TYPES
+        )
     
     @staticmethod
-    def validate_document(file: UploadFile) -> None:
+    def validate_document(file: UploadFile) -> str:
         """
         Validate document file
         
         Args:
             file: Uploaded file
             
+        Returns:
+            Detected MIME type
+            
         Raises:
             HTTPException: If validation fails
         """
-        FileValidator.validate_file_size(file, MAX_DOCUMENT_SIZE)
-        FileValidator.validate_file_extension(file.filename, ALLOWED_EXTENSIONS["document"])
-        FileValidator.validate_mime_type(file, ALLOWED_DOCUMENT_TYPES)
+        return FileValidator.validate_all(
+            file, MAX_DOCUMENT_SIZE, ALLOWED_EXTENSIONS["document"], ALLOWED_DOCUMENT_TYPES
+        )
     
     @staticmethod
-    def validate_file(file: UploadFile, file_type: str = "all") -> None:
+    def validate_file(file: UploadFile, file_type: str = "all") -> str:
         """
         Validate any file based on type
         
@@ -148,23 +264,25 @@ class FileValidator:
             file: Uploaded file
             file_type: Type of file ("image", "document", "all")
             
+        Returns:
+            Detected MIME type
+            
         Raises:
             HTTPException: If validation fails
         """
         if file_type == "image":
-            FileValidator.validate_image(file)
+            return FileValidator.validate_image(file)
         elif file_type == "document":
-            FileValidator.validate_document(file)
+            return FileValidator.validate_document(file)
         else:
             # General validation
-            FileValidator.validate_file_size(file)
-            FileValidator.validate_file_extension(file.filename, ALLOWED_EXTENSIONS["all"])
-            allowed_types = ALLOWED_IMAGE_TYPES + ALLOWED_DOCUMENT_TYPES
-            FileValidator.validate_mime_type(file, allowed_types)
+            return FileValidator.validate_all(
+                file, MAX_FILE_SIZE, ALLOWED_EXTENSIONS["all"], ALLOWED_ALL_TYPES
+            )
 
 
 # Convenience functions
-def validate_upload(file: UploadFile, file_type: str = "all") -> None:
+def validate_upload(file: UploadFile, file_type: str = "all") -> str:
     """
     Convenience function to validate uploaded file
     
@@ -172,10 +290,13 @@ def validate_upload(file: UploadFile, file_type: str = "all") -> None:
         file: Uploaded file
         file_type: Type of file ("image", "document", "all")
         
+    Returns:
+        Detected MIME type
+        
     Raises:
         HTTPException: If validation fails
     """
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
     
-    FileValidator.validate_file(file, file_type)
\ No newline at end of file
+    return FileValidator.validate_file(file, file_type)
@@ -0,0 +1,55 @@
+"""
+Shared HTTP client session
+
+One aiohttp connection pool for all outbound HTTP calls (Tavily, RAGFlow,
+MCP servers, company websites), so concurrent calls from different
+integrations reuse sockets and TLS sessions to the same hosts.
+"""
+
+import asyncio
+import weakref
+
+import aiohttp
+
+# Pool sized for the research fan-out (Tavily + RAGFlow + MCP in one gather)
+HTTP_POOL_LIMIT = 200
+HTTP_POOL_LIMIT_PER_HOST = 32
+
+_HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30)
+# aiohttp sessions are loop-bound, so one per event loop
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Return the shared aiohttp session of the running event loop, creating it lazily.
+
+    Celery tasks drive the integrations from short-lived event loops; each such
+    loop gets its own session, which must be closed with close_session() before
+    the loop is closed.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=60,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        session = _sessions[loop] = aiohttp.ClientSession(connector=connector, timeout=_HTTP_TIMEOUT)
+    return session
+
+
+async def close_session() -> None:
+    """
+    Close the HTTP session of the running event loop
+
+    Called on application shutdown and by Celery tasks before closing their loop.
+    """
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -2,8 +2,10 @@
 Platform mapping and filtering utilities
 """
 
-from typing import List, Dict, Set
+from typing import List, Dict, FrozenSet, Set, Tuple
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
 
 class ContentType(Enum):
     BLOG = "blog"
@@ -11,8 +13,8 @@ class ContentType(Enum):
     EMAIL = "email"
     NEWSLETTER = "newsletter"
 
-# Platform type mappings
-PLATFORM_TYPE_MAPPING = {
+# Platform type mappings (read-only - get_platform_type memoizes lookups)
+PLATFORM_TYPE_MAPPING = MappingProxyType({
     # Blog platforms
     "blog": ContentType.BLOG,
     "wordpress": ContentType.BLOG,
@@ -37,10 +39,35 @@ PLATFORM_TYPE_MAPPING = {
     "newsletter": ContentType.NEWSLETTER,
     "mailchimp": ContentType.EMAIL,
     "sendinblue": ContentType.EMAIL,
+})
+
+# Reverse index: content type -> known platform names
+CONTENT_TYPE_TO_PLATFORMS: Dict[ContentType, FrozenSet[str]] = {
+    content_type: frozenset(
+        name for name, mapped in PLATFORM_TYPE_MAPPING.items() if mapped is content_type
+    )
+    for content_type in ContentType
+}
+
+# Topic category -> content types to generate
+_CATEGORY_CONTENT_TYPES: Dict[str, Tuple[ContentType, ...]] = {
+    "blog": (ContentType.BLOG,),
+    "article": (ContentType.BLOG,),
+    "post": (ContentType.BLOG,),
+    "social_media": (ContentType.SOCIAL_MEDIA,),
+    "social": (ContentType.SOCIAL_MEDIA,),
+    "sm": (ContentType.SOCIAL_MEDIA,),
+    "email": (ContentType.EMAIL,),
+    "newsletter": (ContentType.NEWSLETTER,),
 }
+_ALL_CONTENT_TYPES = tuple(ContentType)
 
+@lru_cache(maxsize=256)
 def get_platform_type(platform_name: str) -> ContentType:
     """Get the content type for a platform"""
+    # Already-normalized names (the usual case) skip lower()/strip()
+    if platform_name in PLATFORM_TYPE_MAPPING:
+        return PLATFORM_TYPE_MAPPING[platform_name]
     platform_lower = platform_name.lower().strip()
     return PLATFORM_TYPE_MAPPING.get(platform_lower, ContentType.SOCIAL_MEDIA)
 
@@ -50,32 +77,24 @@ def filter_platforms_by_content_type(
 ) -> List[str]:
     """Filter platforms by allowed content types"""
     allowed_types = set(content_types)
+    allowed_names = frozenset().union(*(CONTENT_TYPE_TO_PLATFORMS[t] for t in allowed_types))
+    # Unknown platforms count as social media (see get_platform_type)
+    allow_unknown = ContentType.SOCIAL_MEDIA in allowed_types
     return [
-        platform for platform in platforms
-        if get_platform_type(platform) in allowed_types
+        platform for platform, name in zip(platforms, (p.lower().strip() for p in platforms))
+        if name in allowed_names or (allow_unknown and name not in PLATFORM_TYPE_MAPPING)
     ]
 
 def get_platforms_for_topic_category(category: str) -> List[ContentType]:
     """Get appropriate platform types for a topic category"""
-    category_lower = category.lower()
-    
-    if category_lower in ["blog", "article", "post"]:
-        return [ContentType.BLOG]
-    elif category_lower in ["social_media", "social", "sm"]:
-        return [ContentType.SOCIAL_MEDIA]
-    elif category_lower == "email":
-        return [ContentType.EMAIL]
-    elif category_lower == "newsletter":
-        return [ContentType.NEWSLETTER]
-    else:
-        # Default: all types
-        return list(ContentType)
+    # Default: all types
+    return list(_CATEGORY_CONTENT_TYPES.get(category.lower(), _ALL_CONTENT_TYPES))
 
 def should_generate_for_platform(
     platform_name: str,
     topic_category: str
 ) -> bool:
     """Check if content should be generated for a platform based on topic category"""
-    allowed_types = get_platforms_for_topic_category(topic_category)
-    platform_type = get_platform_type(platform_name)
-    return platform_type in allowed_types
\ No newline at end of file
+    # Tuple lookup directly - no list copy in the platforms x topics loops
+    allowed_types = _CATEGORY_CONTENT_TYPES.get(topic_category.lower(), _ALL_CONTENT_TYPES)
+    return get_platform_type(platform_name) in allowed_types
\ No newline at end of file
@@ -3,19 +3,41 @@ System inicjalizacji podstawowych promptów AI.
 Automatycznie ładuje prompty przy starcie aplikacji.
 """
 
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.db.models import AIPrompt, AIModelAssignment
 from app.db.database import SessionLocal
+from app.core.prompt_manager import invalidate_prompt_cache
+from app.core.context_cache import bump_prompts_version
+
+
+# Nazwy promptów systemowych - wystarczają do sprawdzenia bazy bez budowania szablonów
+# (muszą odpowiadać kluczom get_default_prompts)
+DEFAULT_PROMPT_NAMES = (
+    "strategy_parser",
+    "generate_blog_topics_for_selection",
+    "generate_content_plan",
+    "generate_blog_content",
+    "generate_social_media_variant",
+    "analyze_content_brief",
+    "revise_content_variant",
+    "contextualize_content",
+)
 
 
 class PromptInitializer:
     """Klasa odpowiedzialna za inicjalizację podstawowych promptów AI"""
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_default_prompts() -> Dict[str, Dict[str, any]]:
-        """Zwraca słownik wszystkich podstawowych promptów systemowych"""
+        """
+        Zwraca słownik wszystkich podstawowych promptów systemowych.
+        Budowany raz i współdzielony - nie modyfikować.
+        """
         return {
             "strategy_parser": {
                 "template": """Jesteś ekspertem w analizie dokumentów strategii komunikacji. Przeanalizuj poniższy dokument i wyodrębnij wszystkie kluczowe informacje.
@@ -241,6 +263,16 @@ Zwróć dostosowaną treść w formacie JSON:
             }
         }
     
+    @staticmethod
+    def get_default_prompt_names() -> Tuple[str, ...]:
+        """Zwraca nazwy podstawowych promptów systemowych"""
+        return DEFAULT_PROMPT_NAMES
+    
+    @staticmethod
+    def build_default_prompt(prompt_name: str) -> Dict[str, any]:
+        """Zwraca dane (szablon, model, wersja) jednego podstawowego promptu"""
+        return PromptInitializer.get_default_prompts()[prompt_name]
+    
     @staticmethod
     def get_default_model_assignments() -> Dict[str, str]:
         """Zwraca domyślne przypisania modeli do zadań"""
@@ -274,11 +306,18 @@ Zwróć dostosowaną treść w formacie JSON:
         }
         
         default_prompts = PromptInitializer.get_default_prompts()
+        now = datetime.utcnow()
+        # Nowe wiersze zapisywane jednym INSERT-em (executemany)
+        new_prompts = []
+        
+        # Istniejące prompty jednym zapytaniem (IN) zamiast osobnego dla każdej nazwy
+        existing_prompts = {
+            prompt.prompt_name: prompt
+            for prompt in db.query(AIPrompt).filter(AIPrompt.prompt_name.in_(default_prompts.keys()))
+        }
         
         for prompt_name, prompt_data in default_prompts.items():
-            existing_prompt = db.query(AIPrompt).filter(
-                AIPrompt.prompt_name == prompt_name
-            ).first()
+            existing_prompt = existing_prompts.get(prompt_name)
             
             if existing_prompt and not force:
                 results["skipped"].append(prompt_name)
@@ -290,34 +329,45 @@ Zwróć dostosowaną treść w formacie JSON:
                 results["updated"].append(prompt_name)
             else:
                 # Stwórz nowy prompt
-                new_prompt = AIPrompt(
-                    prompt_name=prompt_name,
-                    prompt_template=prompt_data["template"],
-                    version=prompt_data["version"],
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                db.add(new_prompt)
+                new_prompts.append({
+                    "prompt_name": prompt_name,
+                    "prompt_template": prompt_data["template"],
+                    "version": prompt_data["version"],
+                    "created_at": now,
+                    "updated_at": now
+                })
                 results["created"].append(prompt_name)
         
+        if new_prompts:
+            db.execute(insert(AIPrompt), new_prompts)
+        
         # Inicjalizuj przypisania modeli
         model_assignments = PromptInitializer.get_default_model_assignments()
+        new_assignments = []
+        
+        existing_tasks = {
+            task_name for (task_name,) in db.query(AIModelAssignment.task_name).filter(
+                AIModelAssignment.task_name.in_(model_assignments.keys())
+            )
+        }
         
         for task_name, model_name in model_assignments.items():
-            existing_assignment = db.query(AIModelAssignment).filter(
-                AIModelAssignment.task_name == task_name
-            ).first()
-            
-            if not existing_assignment:
-                new_assignment = AIModelAssignment(
-                    task_name=task_name,
-                    model_name=model_name,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                db.add(new_assignment)
+            if task_name not in existing_tasks:
+                new_assignments.append({
+                    "task_name": task_name,
+                    "model_name": model_name,
+                    "created_at": now,
+                    "updated_at": now
+                })
+        
+        if new_assignments:
+            db.execute(insert(AIModelAssignment), new_assignments)
         
         db.commit()
+        # INSERT przez Core omija zdarzenia ORM - cache (także zapamiętane braki) czyścimy ręcznie,
+        # w innych procesach przez wersję promptów w Redis
+        invalidate_prompt_cache()
+        bump_prompts_version()
         return results
     
     @staticmethod
@@ -326,7 +376,7 @@ Zwróć dostosowaną treść w formacie JSON:
         db = SessionLocal()
         try:
             # Sprawdź czy są jakiekolwiek prompty
-            prompt_count = db.query(AIPrompt).count()
+            prompt_count = db.execute(select(func.count()).select_from(AIPrompt)).scalar()
             
             if prompt_count == 0:
                 print("No AI prompts found. Initializing default prompts...")
@@ -335,25 +385,32 @@ Zwróć dostosowaną treść w formacie JSON:
             else:
                 print(f"Found {prompt_count} existing prompts.")
                 
-                # Sprawdź czy wszystkie wymagane prompty istnieją
-                required_prompts = PromptInitializer.get_default_prompts().keys()
-                existing_prompts = {p.prompt_name for p in db.query(AIPrompt).all()}
+                # Sprawdź czy wszystkie wymagane prompty istnieją - porównujemy same nazwy,
+                # szablony budujemy tylko dla brakujących
+                required_prompts = PromptInitializer.get_default_prompt_names()
+                existing_prompts = set(db.execute(
+                    select(AIPrompt.prompt_name).where(AIPrompt.prompt_name.in_(required_prompts))
+                ).scalars())
                 missing_prompts = set(required_prompts) - existing_prompts
                 
                 if missing_prompts:
                     print(f"Missing prompts: {missing_prompts}")
-                    # Inicjalizuj tylko brakujące
+                    # Inicjalizuj tylko brakujące (jednym INSERT-em)
+                    now = datetime.utcnow()
+                    rows = []
                     for prompt_name in missing_prompts:
-                        prompt_data = PromptInitializer.get_default_prompts()[prompt_name]
-                        new_prompt = AIPrompt(
-                            prompt_name=prompt_name,
-                            prompt_template=prompt_data["template"],
-                            version=prompt_data["version"],
-                            created_at=datetime.utcnow(),
-                            updated_at=datetime.utcnow()
-                        )
-                        db.add(new_prompt)
+                        prompt_data = PromptInitializer.build_default_prompt(prompt_name)
+                        rows.append({
+                            "prompt_name": prompt_name,
+                            "prompt_template": prompt_data["template"],
+                            "version": prompt_data["version"],
+                            "created_at": now,
+                            "updated_at": now
+                        })
+                    db.execute(insert(AIPrompt), rows)
                     db.commit()
+                    invalidate_prompt_cache()
+                    bump_prompts_version()
                     print(f"Added {len(missing_prompts)} missing prompts.")
                     
         finally:
@@ -1,11 +1,94 @@
-from functools import lru_cache
-from typing import Optional
+import threading
+from typing import Optional, Union
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, object_session
 
 from app.db.models import AIPrompt, OrganizationAIPrompt
 from app.db.database import get_db
+from app.core.context_cache import get_prompts_version, bump_prompts_version
+
+# Cache szablonów współdzielony w procesie:
+# (organization_id, prompt_name) -> (wersja promptów z Redis, prompt_template).
+# Wpis z inną wersją niż bieżąca jest pomijany, więc zmiana zapisana w innym
+# procesie (API -> workery Celery) widoczna jest od następnego odczytu.
+# TTL ogranicza nieaktualność tylko wtedy, gdy Redis jest niedostępny.
+_PROMPT_CACHE: TTLCache = TTLCache(maxsize=512, ttl=30)
+_PROMPT_CACHE_LOCK = threading.Lock()
+_MISSING = object()
+_PENDING_PROMPTS_KEY = "invalidate_prompt_cache"
+
+
+def invalidate_prompt_cache(prompt_name: Optional[str] = None) -> None:
+    """
+    Usuwa z cache szablony promptu (lub wszystkie, gdy prompt_name=None).
+    Zmiana promptu globalnego wpływa na wszystkie organizacje, więc
+    usuwamy wpisy promptu niezależnie od organization_id.
+    """
+    with _PROMPT_CACHE_LOCK:
+        if prompt_name is None:
+            _PROMPT_CACHE.clear()
+            return
+        for key in [k for k in _PROMPT_CACHE.keys() if k[1] == prompt_name]:
+            _PROMPT_CACHE.pop(key, None)
+
+
+@event.listens_for(AIPrompt, "after_insert")
+@event.listens_for(AIPrompt, "after_update")
+@event.listens_for(AIPrompt, "after_delete")
+@event.listens_for(OrganizationAIPrompt, "after_insert")
+@event.listens_for(OrganizationAIPrompt, "after_update")
+@event.listens_for(OrganizationAIPrompt, "after_delete")
+def _collect_prompt(mapper, connection, target):
+    """Zapamiętuje zmieniony prompt - cache unieważniamy dopiero po commit."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_PROMPTS_KEY, set()).add(target.prompt_name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_prompts(session):
+    """Unieważnia cache lokalnie i (przez wersję w Redis) we wszystkich procesach."""
+    prompt_names = session.info.pop(_PENDING_PROMPTS_KEY, None)
+    if prompt_names:
+        for prompt_name in prompt_names:
+            invalidate_prompt_cache(prompt_name)
+        bump_prompts_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_prompts(session):
+    """Wycofane zmiany nie unieważniają cache."""
+    session.info.pop(_PENDING_PROMPTS_KEY, None)
+
+
+def _global_template_subquery(prompt_name: str):
+    return select(AIPrompt.prompt_template)\
+        .where(AIPrompt.prompt_name == prompt_name)\
+        .order_by(AIPrompt.version.desc())\
+        .limit(1)\
+        .scalar_subquery()
+
+
+def _prompt_stmt(organization_id: Optional[int], prompt_name: str):
+    """
+    Zapytanie o szablon promptu (tylko kolumna szablonu). Prompt organizacji
+    ma pierwszeństwo przed globalnym (COALESCE dwóch podzapytań).
+    Działa zarówno z Session, jak i z AsyncSession.
+    """
+    if not organization_id:
+        return select(_global_template_subquery(prompt_name))
+    return select(func.coalesce(
+        select(OrganizationAIPrompt.prompt_template)
+        .where(OrganizationAIPrompt.organization_id == organization_id)
+        .where(OrganizationAIPrompt.prompt_name == prompt_name)
+        .where(OrganizationAIPrompt.is_active == True)
+        .order_by(OrganizationAIPrompt.version.desc())
+        .limit(1)
+        .scalar_subquery(),
+        _global_template_subquery(prompt_name)
+    ))
 
 
 class PromptManager:
@@ -14,7 +97,7 @@ class PromptManager:
     Obsługuje zarówno prompty globalne jak i specyficzne dla organizacji.
     """
     
-    def __init__(self, db_session: Session, organization_id: Optional[int] = None):
+    def __init__(self, db_session: Union[Session, AsyncSession], organization_id: Optional[int] = None):
         self.db_session = db_session
         self.organization_id = organization_id
     
@@ -29,72 +112,63 @@ class PromptManager:
         Returns:
             Szablon promptu jako string lub None jeśli nie znaleziono
         """
-        try:
-            # Jeśli podano organization_id, najpierw szukaj promptu organizacji
-            if self.organization_id:
-                org_prompt = self.db_session.query(OrganizationAIPrompt)\
-                    .filter(OrganizationAIPrompt.organization_id == self.organization_id)\
-                    .filter(OrganizationAIPrompt.prompt_name == prompt_name)\
-                    .filter(OrganizationAIPrompt.is_active == True)\
-                    .order_by(OrganizationAIPrompt.version.desc())\
-                    .first()
-                
-                if org_prompt:
-                    return org_prompt.prompt_template
-            
-            # Jeśli nie znaleziono promptu organizacji, użyj globalnego
-            result = self.db_session.query(AIPrompt)\
-                .filter(AIPrompt.prompt_name == prompt_name)\
-                .order_by(AIPrompt.version.desc())\
-                .first()
-            
-            if result:
-                return result.prompt_template
-            return None
-            
-        except Exception as e:
-            print(f"Błąd podczas pobierania promptu {prompt_name}: {str(e)}")
-            return None
+        if not isinstance(self.db_session, AsyncSession):
+            return self._get_cached_prompt(prompt_name)
+        
+        # Z AsyncSession zapytanie nie blokuje pętli zdarzeń
+        version, prompt_template = self._cache_get(prompt_name)
+        if prompt_template is _MISSING:
+            try:
+                prompt_template = (await self.db_session.execute(self._lookup(prompt_name))).scalar()
+            except Exception as e:
+                print(f"Błąd podczas pobierania promptu {prompt_name}: {str(e)}")
+                return None
+            self._cache_set(prompt_name, version, prompt_template)
+        return prompt_template
     
     def _get_cached_prompt(self, prompt_name: str) -> Optional[str]:
         """
-        Cache'owana wersja get_prompt dla lepszej wydajności.
-        Uwaga: Cache jest per instancja, więc różne organizacje mają osobne cache.
+        Cache'owana wersja get_prompt dla lepszej wydajności (synchroniczna sesja).
+        Cache jest współdzielony w procesie i kluczowany (organization_id, prompt_name).
         """
-        # Tworzymy klucz cache zawierający organization_id
-        cache_key = f"{self.organization_id or 'global'}:{prompt_name}"
-        
-        # W przypadku cache używamy synchronicznej wersji
-        try:
-            # Jeśli podano organization_id, najpierw szukaj promptu organizacji
-            if self.organization_id:
-                org_prompt = self.db_session.query(OrganizationAIPrompt)\
-                    .filter(OrganizationAIPrompt.organization_id == self.organization_id)\
-                    .filter(OrganizationAIPrompt.prompt_name == prompt_name)\
-                    .filter(OrganizationAIPrompt.is_active == True)\
-                    .order_by(OrganizationAIPrompt.version.desc())\
-                    .first()
-                
-                if org_prompt:
-                    return org_prompt.prompt_template
-            
-            # Jeśli nie znaleziono promptu organizacji, użyj globalnego
-            result = self.db_session.query(AIPrompt)\
-                .filter(AIPrompt.prompt_name == prompt_name)\
-                .order_by(AIPrompt.version.desc())\
-                .first()
-            
-            if result:
-                return result.prompt_template
-            return None
-            
-        except Exception as e:
-            print(f"Błąd podczas pobierania promptu z cache {prompt_name}: {str(e)}")
-            return None
+        version, prompt_template = self._cache_get(prompt_name)
+        if prompt_template is _MISSING:
+            try:
+                prompt_template = self.db_session.execute(self._lookup(prompt_name)).scalar()
+            except Exception as e:
+                print(f"Błąd podczas pobierania promptu {prompt_name}: {str(e)}")
+                return None
+            self._cache_set(prompt_name, version, prompt_template)
+        return prompt_template
+    
+    def _lookup(self, prompt_name: str):
+        """
+        Jedyne zapytanie o szablon (organizacja, potem global) - wspólne
+        dla ścieżki synchronicznej i asynchronicznej.
+        """
+        return _prompt_stmt(self.organization_id, prompt_name)
+    
+    def _cache_get(self, prompt_name: str):
+        """
+        (bieżąca wersja promptów, szablon z cache lub _MISSING).
+        Wersję zwracamy, żeby zapisać nią wynik zapytania - jeśli w międzyczasie
+        ktoś zmieni prompt, wpis od razu będzie nieaktualny.
+        """
+        version = get_prompts_version()
+        with _PROMPT_CACHE_LOCK:
+            entry = _PROMPT_CACHE.get((self.organization_id, prompt_name))
+        if entry is None or entry[0] != version:
+            return version, _MISSING
+        return version, entry[1]
+    
+    def _cache_set(self, prompt_name: str, version: Optional[int], prompt_template: Optional[str]) -> None:
+        # Zapamiętujemy również None, żeby brak promptu nie odpytywał bazy
+        with _PROMPT_CACHE_LOCK:
+            _PROMPT_CACHE[(self.organization_id, prompt_name)] = (version, prompt_template)
     
     def clear_cache(self):
         """Czyści cache promptów."""
-        self._get_cached_prompt.cache_clear()
+        invalidate_prompt_cache()
 
 
 # Dependency provider dla FastAPI
@@ -0,0 +1,132 @@
+"""
+Shared Tavily search client
+
+The API key read once from settings, bounded concurrency and per-topic
+result caching for all Tavily research callers (over the shared HTTP session).
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.context_cache import get_cached_context, set_cached_context
+from app.core.http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Fan-out limits; results are shared across organizations for an hour
+TAVILY_MAX_CONCURRENCY = 5
+TAVILY_MAX_SEARCHES = 5
+TAVILY_QUERY_TIMEOUT = aiohttp.ClientTimeout(total=15)
+TAVILY_CACHE_TTL_HOURS = 1
+
+
+class TavilyClient:
+    """
+    Tavily REST search with bounded concurrency and per-topic caching
+    """
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = TAVILY_MAX_CONCURRENCY):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        # asyncio semaphores are loop-bound, so one per event loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._headers = {
+            "api-key": api_key or "",
+            "content-type": "application/json"
+        }
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def search(self, topics: List[str], limit: int = TAVILY_MAX_SEARCHES) -> Dict[str, Any]:
+        """
+        Search Tavily for each topic (duplicates removed, at most `limit`)
+
+        Returns:
+            Mapping topic -> {"answer", "results"}; failed topics are omitted
+        """
+        if not self.api_key:
+            logger.warning("Tavily API key not found")
+            return {}
+
+        unique_topics = list(dict.fromkeys(topics))[:limit]
+        if not unique_topics:
+            return {}
+
+        try:
+            session = await get_session()
+            found = await asyncio.gather(
+                *[self._search_one(session, topic) for topic in unique_topics]
+            )
+        except Exception as e:
+            logger.error(f"Tavily research error: {e}")
+            return {}
+
+        return {topic: data for topic, data in zip(unique_topics, found) if data is not None}
+
+    async def _search_one(self, session: aiohttp.ClientSession, topic: str) -> Optional[Dict[str, Any]]:
+        """
+        Run a single Tavily search (cached per topic, bounded concurrency)
+        """
+        cache_key = ["tavily", topic]
+        cached = get_cached_context(cache_key)
+        if cached is not None:
+            return cached
+
+        payload = {
+            "query": topic,
+            "search_depth": "advanced",
+            "max_results": 5,
+            "include_answer": True
+        }
+
+        async with self._semaphore():
+            try:
+                async with session.post(
+                    TAVILY_SEARCH_URL,
+                    json=payload,
+                    headers=self._headers,
+                    timeout=TAVILY_QUERY_TIMEOUT
+                ) as response:
+                    if response.status != 200:
+                        logger.error(f"Tavily API error: {response.status}")
+                        return None
+
+                    data = await response.json()
+            except asyncio.TimeoutError:
+                logger.warning(f"Tavily search timed out for: {topic}")
+                return None
+            except (aiohttp.ClientError, ValueError) as e:
+                # One failed topic must not discard the others
+                logger.error(f"Tavily search failed for {topic}: {e}")
+                return None
+
+        result = {
+            "answer": data.get("answer", ""),
+            "results": [
+                {
+                    "title": r.get("title", ""),
+                    "content": r.get("content", "")[:500],
+                    "url": r.get("url", "")
+                }
+                for r in data.get("results", [])[:3]
+            ]
+        }
+        set_cached_context(cache_key, result, ttl_hours=TAVILY_CACHE_TTL_HOURS)
+        return result
+
+
+tavily_client = TavilyClient(api_key=settings.tavily_api_key)
@@ -5,9 +5,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db.database import SessionLocal
-from app.db.models import AIPrompt
-
-db = SessionLocal()
+from app.db.models import AIPrompt, AIModelAssignment
 
 # Define missing prompts
 missing_prompts = [
@@ -82,41 +80,45 @@ Zwróć wynik jako JSON:
     }
 ]
 
-# Create missing prompts
-for prompt_data in missing_prompts:
-    existing = db.query(AIPrompt).filter(AIPrompt.prompt_name == prompt_data["prompt_name"]).first()
-    if not existing:
-        new_prompt = AIPrompt(
-            prompt_name=prompt_data["prompt_name"],
-            prompt_template=prompt_data["prompt_template"],
-            description=prompt_data["description"]
-        )
-        db.add(new_prompt)
-        db.commit()
-        print(f"Created prompt '{prompt_data['prompt_name']}' with ID: {new_prompt.id}")
-    else:
-        print(f"Prompt '{prompt_data['prompt_name']}' already exists")
-
-# Also create AI model assignments if needed
-from app.db.models import AIModelAssignment
-
+# SM tasks that need a model assignment
 sm_tasks = [
     ("generate_sm_variants_from_blog_context", "Generate SM posts from blog topics"),
     ("generate_sm_from_brief", "Generate SM posts from brief insights"),
     ("generate_standalone_sm_posts", "Generate standalone SM posts")
 ]
 
-for task_name, description in sm_tasks:
-    existing = db.query(AIModelAssignment).filter(AIModelAssignment.task_name == task_name).first()
-    if not existing:
-        assignment = AIModelAssignment(
-            task_name=task_name,
-            model_name="models/gemini-1.5-pro-latest",
-            description=description
-        )
-        db.add(assignment)
-        db.commit()
-        print(f"Created model assignment for '{task_name}'")
-
-db.close()
-print("\nAll SM prompts and model assignments created!")
\ No newline at end of file
+# One session and one transaction (committed on exit, rolled back on error)
+with SessionLocal() as db, db.begin():
+    # Create missing prompts
+    new_prompts = []
+    for prompt_data in missing_prompts:
+        existing = db.query(AIPrompt).filter(AIPrompt.prompt_name == prompt_data["prompt_name"]).first()
+        if not existing:
+            new_prompts.append(AIPrompt(
+                prompt_name=prompt_data["prompt_name"],
+                prompt_template=prompt_data["prompt_template"],
+                description=prompt_data["description"]
+            ))
+        else:
+            print(f"Prompt '{prompt_data['prompt_name']}' already exists")
+
+    # Also create AI model assignments if needed
+    new_assignments = []
+    for task_name, description in sm_tasks:
+        existing = db.query(AIModelAssignment).filter(AIModelAssignment.task_name == task_name).first()
+        if not existing:
+            new_assignments.append(AIModelAssignment(
+                task_name=task_name,
+                model_name="models/gemini-1.5-pro-latest",
+                description=description
+            ))
+
+    db.add_all(new_prompts + new_assignments)
+    db.flush()
+
+    for new_prompt in new_prompts:
+        print(f"Created prompt '{new_prompt.prompt_name}' with ID: {new_prompt.id}")
+    for assignment in new_assignments:
+        print(f"Created model assignment for '{assignment.task_name}'")
+
+print("\nAll SM prompts and model assignments created!")
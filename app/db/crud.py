@@ -1,8 +1,14 @@
-from sqlalchemy.orm import Session, selectinload, joinedload
-from sqlalchemy import and_, or_, func
-from typing import List, Optional
+from sqlalchemy.orm import Session, selectinload, joinedload, object_session
+from sqlalchemy import and_, or_, func, event, exists
+from typing import List, Optional, Tuple
 from app.db import models, schemas
 from app.core.security import get_password_hash, verify_password
+from app.core.context_cache import (
+    get_cached_plan_organization,
+    set_cached_plan_organization,
+    invalidate_plan_organization,
+    invalidate_plan_topic_counts,
+)
 from datetime import datetime
 import logging
 
@@ -135,6 +141,26 @@ class OrganizationCRUD:
             )
         ).first()
         return result is not None
+    
+    def get_with_access(
+        self, db: Session, org_id: int, user_id: int
+    ) -> Optional[Tuple[models.Organization, bool, bool]]:
+        """Organizacja wraz z (członkostwo, właściciel) użytkownika - jednym zapytaniem"""
+        is_member = exists().where(
+            and_(
+                models.user_organization.c.organization_id == models.Organization.id,
+                models.user_organization.c.user_id == user_id
+            )
+        )
+        row = db.query(
+            models.Organization,
+            is_member.label("is_member"),
+            (models.Organization.owner_id == user_id).label("is_owner")
+        ).filter(models.Organization.id == org_id).first()
+        if row is None:
+            return None
+        organization, member, owner = row
+        return organization, bool(member), bool(owner)
 
 class ProjectCRUD:
     def get_by_id(self, db: Session, project_id: int) -> Optional[models.Project]:
@@ -298,6 +324,19 @@ class ContentPlanCRUD:
     def get_by_id(self, db: Session, content_plan_id: int) -> Optional[models.ContentPlan]:
         return db.query(models.ContentPlan).filter(models.ContentPlan.id == content_plan_id).first()
     
+    def get_organization_id(self, db: Session, content_plan_id: int) -> Optional[int]:
+        """Return the owning organization id of a plan, served from Redis when possible"""
+        organization_id = get_cached_plan_organization(content_plan_id)
+        if organization_id is not None:
+            return organization_id
+        
+        organization_id = db.query(models.ContentPlan.organization_id).filter(
+            models.ContentPlan.id == content_plan_id
+        ).scalar()
+        if organization_id is not None:
+            set_cached_plan_organization(content_plan_id, organization_id)
+        return organization_id
+    
     def get_organization_content_plans(self, db: Session, org_id: int) -> List[models.ContentPlan]:
         return db.query(models.ContentPlan).filter(
             models.ContentPlan.organization_id == org_id,
@@ -353,6 +392,39 @@ class ContentPlanCRUD:
         ).all()
 
 
+@event.listens_for(models.ContentPlan, "after_update")
+@event.listens_for(models.ContentPlan, "after_delete")
+def _invalidate_plan_organization(mapper, connection, target):
+    """Keep the cached plan -> organization mapping in sync with the database"""
+    invalidate_plan_organization(target.id)
+
+
+_PENDING_COUNTS_KEY = "invalidate_plan_topic_counts"
+
+
+@event.listens_for(models.SuggestedTopic, "after_insert")
+@event.listens_for(models.SuggestedTopic, "after_update")
+@event.listens_for(models.SuggestedTopic, "after_delete")
+def _collect_plan_topic_counts(mapper, connection, target):
+    """Remember the plan whose topic counters must be dropped once the transaction commits"""
+    session = object_session(target)
+    if session is not None and target.content_plan_id is not None:
+        session.info.setdefault(_PENDING_COUNTS_KEY, set()).add(target.content_plan_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_plan_topic_counts(session):
+    """Drop the cached counters after commit, so a concurrent read cannot re-cache pre-commit counts"""
+    for plan_id in session.info.pop(_PENDING_COUNTS_KEY, ()):
+        invalidate_plan_topic_counts(plan_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_plan_topic_counts(session):
+    """Rolled back changes leave the cached counters valid"""
+    session.info.pop(_PENDING_COUNTS_KEY, None)
+
+
 class SuggestedTopicCRUD:
     def get_by_id(self, db: Session, topic_id: int) -> Optional[models.SuggestedTopic]:
         return db.query(models.SuggestedTopic).options(
@@ -0,0 +1,346 @@
+"""
+Diagnostic commands for inspecting generated content.
+
+Replaces the standalone ``check_*.py`` debug scripts with a single dispatcher
+so that the engine, the session and the model imports are set up once:
+
+    python -m app.diagnostics check-brief --brief-id 6
+    python -m app.diagnostics check-sm-status
+"""
+
+import argparse
+import json
+from typing import Callable, Dict, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
+
+from app.db.database import SessionLocal
+from app.db.models import (
+    ContentBrief,
+    ContentDraft,
+    ContentPlan,
+    ContentVariant,
+    SuggestedTopic,
+)
+
+DEFAULT_PLAN_ID = 6
+DEFAULT_BRIEF_ID = 6
+# Characters fetched around a match in check-full-brief
+CONTEXT_WINDOW = 1000
+
+_COMMANDS: Dict[str, Callable[[Session, argparse.Namespace], None]] = {}
+
+
+def command(name: str):
+    """Register a function as a diagnostics subcommand"""
+    def decorator(func_: Callable[[Session, argparse.Namespace], None]):
+        _COMMANDS[name] = func_
+        return func_
+    return decorator
+
+
+@command("approve-topics")
+def approve_topics(db: Session, args: argparse.Namespace) -> None:
+    """Approve suggested topics for testing"""
+    topics = db.query(SuggestedTopic).filter(
+        SuggestedTopic.content_plan_id == args.plan_id,
+        SuggestedTopic.status == "suggested",
+        SuggestedTopic.category == args.category
+    ).limit(args.limit).all()
+
+    print(f"Found {len(topics)} suggested topics to approve")
+
+    for topic in topics:
+        print(f"\nApproving topic: {topic.title}")
+        topic.status = "approved"
+
+    db.commit()
+    print(f"\nApproved {len(topics)} topics")
+
+
+@command("check-brief")
+def check_brief_analysis(db: Session, args: argparse.Namespace) -> None:
+    """Check the brief analysis results"""
+    brief = db.query(
+        ContentBrief.id,
+        ContentBrief.file_path,
+        ContentBrief.key_topics,
+        ContentBrief.ai_analysis
+    ).filter(ContentBrief.id == args.brief_id).first()
+
+    if not brief:
+        print("Brief not found")
+        return
+
+    print(f"Brief ID: {brief.id}")
+    print(f"File path: {brief.file_path}")
+    print(f"Key topics: {brief.key_topics}")
+
+    if not brief.ai_analysis:
+        print("No AI analysis found")
+        return
+
+    print("\n=== AI ANALYSIS ===")
+    print(json.dumps(brief.ai_analysis, indent=2, ensure_ascii=False))
+
+    # Check for hallucination keywords; the analysis is already loaded for
+    # printing, so matching here is cheaper than extra ILIKE round-trips
+    analysis_str = json.dumps(brief.ai_analysis).lower()
+    print("\n=== HALLUCINATION CHECK ===")
+    for keyword in ("sztuczna inteligencja", "ai", "machine learning", "uczenie maszynowe"):
+        print(f"Contains '{keyword}': {keyword in analysis_str}")
+
+    # Check for real content
+    print("\n=== REAL CONTENT CHECK ===")
+    for keyword in ("monitoring", "energia", "cfd", "smart"):
+        print(f"Contains '{keyword}': {keyword in analysis_str}")
+
+
+@command("check-brief-content")
+def check_brief_content(db: Session, args: argparse.Namespace) -> None:
+    """Check what's in the latest brief analysis"""
+    brief = db.query(
+        ContentBrief.id,
+        ContentBrief.content_plan_id,
+        ContentBrief.ai_analysis
+    ).order_by(ContentBrief.created_at.desc()).first()
+
+    if not brief or not brief.ai_analysis:
+        print("Brak briefu lub analizy")
+        return
+
+    print("=== ANALIZA BRIEFU ===")
+    print(f"Brief ID: {brief.id}")
+    print(f"Plan ID: {brief.content_plan_id}")
+
+    analysis = brief.ai_analysis
+
+    print("\n=== COMPANY NEWS (Aktualności firmowe) ===")
+    for i, news in enumerate(analysis.get("company_news", []), 1):
+        print(f"{i}. {news}")
+
+    for header, key in (
+        ("KEY TOPICS", "key_topics"),
+        ("CONTENT INSTRUCTIONS", "content_instructions"),
+        ("MANDATORY TOPICS", "mandatory_topics"),
+    ):
+        print(f"\n=== {header} ===")
+        for item in analysis.get(key, []):
+            print(f"- {item}")
+
+    # Check if there's info about new employee
+    print("\n=== SZUKANIE INFO O NOWYM PRACOWNIKU ===")
+    full_text = json.dumps(analysis, ensure_ascii=False).lower()
+    if "natalia" in full_text:
+        print("✓ Znaleziono informacje o Natalii Szarach")
+    if "manager" in full_text:
+        print("✓ Znaleziono informacje o stanowisku Manager")
+
+
+@command("check-full-brief")
+def check_full_brief(db: Session, args: argparse.Namespace) -> None:
+    """Check full text of the latest brief"""
+    # Slice and search on the server so the whole text never leaves the database
+    row = db.query(
+        ContentBrief.id,
+        func.substring(ContentBrief.extracted_content, 1, 2000).label("preview"),
+        func.strpos(ContentBrief.extracted_content, "Dołączyła do nas Natalia Szarach").label("pos")
+    ).order_by(ContentBrief.created_at.desc()).first()
+
+    if not row or not row.preview:
+        return
+
+    print("=== PEŁNA TREŚĆ BRIEFU ===")
+    print(row.preview)
+
+    # Search for Natalia
+    if row.pos > 0:
+        print("\n\n✓ ZNALEZIONO: 'Dołączyła do nas Natalia Szarach'")
+
+        # Fetch only the window from the match up to the position description
+        window = db.query(
+            func.substring(ContentBrief.extracted_content, row.pos, CONTEXT_WINDOW)
+        ).filter(ContentBrief.id == row.id).scalar()
+        end = window.find("Stanowisko:")
+        print("\n=== KONTEKST ===")
+        print(window[:end + 100] if end != -1 else window)
+
+
+@command("check-drafts")
+def check_draft_variants(db: Session, args: argparse.Namespace) -> None:
+    """Check draft and variant status"""
+    drafts = db.query(ContentDraft).order_by(ContentDraft.created_at.desc()).limit(args.limit).all()
+
+    print(f"=== ANALIZA {len(drafts)} NAJNOWSZYCH DRAFTÓW ===\n")
+
+    drafts_with_variants = 0
+    drafts_without_variants = 0
+
+    for draft in drafts:
+        topic = draft.suggested_topic
+        variants = db.query(ContentVariant).filter(ContentVariant.content_draft_id == draft.id).all()
+
+        print(f"Draft ID: {draft.id}")
+        print(f"Topic: {topic.title[:60]}...")
+        print(f"Category: {topic.category}")
+        print(f"Status: {draft.status}")
+        print(f"Variants: {len(variants)}")
+
+        if variants:
+            drafts_with_variants += 1
+            for v in variants:
+                print(f"  - Platform: {v.platform_name}, Status: {v.status}")
+        else:
+            drafts_without_variants += 1
+            print("  ❌ BRAK WARIANTÓW")
+
+        print()
+
+    print(f"\n=== PODSUMOWANIE ===")
+    print(f"Drafty z wariantami: {drafts_with_variants}")
+    print(f"Drafty bez wariantów: {drafts_without_variants}")
+
+    # Check draft statuses
+    statuses = db.query(ContentDraft.status, func.count(ContentDraft.id))\
+        .group_by(ContentDraft.status).all()
+
+    print(f"\n=== STATUSY DRAFTÓW ===")
+    for status, count in statuses:
+        print(f"{status}: {count}")
+
+
+@command("check-topics")
+def check_generated_topics(db: Session, args: argparse.Namespace) -> None:
+    """Check generated topics for a content plan"""
+    query = db.query(SuggestedTopic).options(
+        load_only(
+            SuggestedTopic.id,
+            SuggestedTopic.title,
+            SuggestedTopic.description,
+            SuggestedTopic.category,
+            SuggestedTopic.status,
+            SuggestedTopic.created_at,
+            SuggestedTopic.meta_data
+        )
+    ).filter(SuggestedTopic.content_plan_id == args.plan_id)
+    if args.category:
+        query = query.filter(SuggestedTopic.category == args.category)
+    topics = query.order_by(SuggestedTopic.created_at.desc()).limit(args.limit).all()
+
+    label = "SM topics" if args.category == "social_media" else "topics"
+    print(f"Found {len(topics)} {label} for content plan {args.plan_id}\n")
+
+    for i, topic in enumerate(topics, 1):
+        print(f"\n=== TOPIC {i} ===")
+        print(f"ID: {topic.id}")
+        print(f"Title: {topic.title}")
+        print(f"Description: {topic.description[:200]}..." if len(topic.description) > 200 else topic.description)
+        print(f"Category: {topic.category}")
+        print(f"Status: {topic.status}")
+        print(f"Created: {topic.created_at}")
+        if topic.meta_data:
+            print(f"Meta data: {json.dumps(topic.meta_data, indent=2)}")
+
+
+@command("check-sm-status")
+def check_sm_content_status(db: Session, args: argparse.Namespace) -> None:
+    """Check status of SM content and why it's not showing in dashboard"""
+    print("=== ANALIZA STANU TREŚCI SM ===\n")
+
+    # 1. Check if there are any content plans
+    plans_count = db.query(func.count(ContentPlan.id)).scalar()
+    print(f"Liczba planów treści: {plans_count}")
+
+    if not plans_count:
+        print("\n❌ Brak planów treści. Najpierw utwórz plan treści.")
+        return
+
+    # 2. Check SM topics
+    sm_topics = db.query(SuggestedTopic).filter(
+        SuggestedTopic.category == "social_media"
+    ).all()
+
+    print(f"\nLiczba tematów SM: {len(sm_topics)}")
+
+    # 3. Check if SM topics have drafts
+    topic_ids_with_drafts = {
+        topic_id for (topic_id,) in db.query(ContentDraft.suggested_topic_id).distinct()
+    }
+    sm_topics_without_drafts = [t for t in sm_topics if t.id not in topic_ids_with_drafts]
+
+    print(f"- Tematy SM z draftami: {len(sm_topics) - len(sm_topics_without_drafts)}")
+    print(f"- Tematy SM bez draftów: {len(sm_topics_without_drafts)}")
+
+    # 4. Check blog topics for comparison
+    blog_topic_ids = [
+        topic_id for (topic_id,) in db.query(SuggestedTopic.id).filter(
+            SuggestedTopic.category == "blog"
+        )
+    ]
+    blog_topics_with_drafts = sum(1 for topic_id in blog_topic_ids if topic_id in topic_ids_with_drafts)
+
+    print(f"\nDla porównania - wpisy blogowe:")
+    print(f"- Liczba tematów blog: {len(blog_topic_ids)}")
+    print(f"- Tematy blog z draftami: {blog_topics_with_drafts}")
+
+    # 5. Check all drafts
+    print(f"\nWszystkie drafty w bazie: {db.query(func.count(ContentDraft.id)).scalar()}")
+
+    # 6. Show sample SM topics without drafts
+    if sm_topics_without_drafts:
+        print("\n=== PRZYKŁADOWE TEMATY SM BEZ DRAFTÓW ===")
+        for topic in sm_topics_without_drafts[:3]:
+            print(f"\nID: {topic.id}")
+            print(f"Tytuł: {topic.title}")
+            print(f"Status: {topic.status}")
+            print(f"Plan ID: {topic.content_plan_id}")
+
+    # 7. Solution
+    print("\n=== ROZWIĄZANIE ===")
+    print("Problem: Tematy SM nie mają utworzonych draftów (ContentDraft)")
+    print("Dashboard pokazuje tylko ContentDraft, więc tematy SM bez draftów są niewidoczne")
+    print("\nMożliwe rozwiązania:")
+    print("1. Automatycznie tworzyć drafty dla zatwierdzonych tematów SM")
+    print("2. Zmodyfikować endpoint aby pokazywał też SuggestedTopic bez draftów")
+    print("3. Dodać przycisk 'Generuj warianty' dla tematów SM w interfejsie")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with one subparser per registered command"""
+    parser = argparse.ArgumentParser(prog="python -m app.diagnostics", description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    approve = subparsers.add_parser("approve-topics", help=approve_topics.__doc__)
+    approve.add_argument("--plan-id", type=int, default=DEFAULT_PLAN_ID)
+    approve.add_argument("--category", default="blog")
+    approve.add_argument("--limit", type=int, default=4)
+
+    brief = subparsers.add_parser("check-brief", help=check_brief_analysis.__doc__)
+    brief.add_argument("--brief-id", type=int, default=DEFAULT_BRIEF_ID)
+
+    subparsers.add_parser("check-brief-content", help=check_brief_content.__doc__)
+    subparsers.add_parser("check-full-brief", help=check_full_brief.__doc__)
+
+    drafts = subparsers.add_parser("check-drafts", help=check_draft_variants.__doc__)
+    drafts.add_argument("--limit", type=int, default=10)
+
+    topics = subparsers.add_parser("check-topics", help=check_generated_topics.__doc__)
+    topics.add_argument("--plan-id", type=int, default=DEFAULT_PLAN_ID)
+    topics.add_argument("--category", choices=["blog", "social_media"], default=None)
+    topics.add_argument("--limit", type=int, default=10)
+
+    subparsers.add_parser("check-sm-status", help=check_sm_content_status.__doc__)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Parse arguments and run the selected command with a shared session"""
+    args = build_parser().parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        _COMMANDS[args.command](db, args)
+    finally:
+        db.close()
@@ -0,0 +1,3 @@
+from app.diagnostics import main
+
+main()
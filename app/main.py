@@ -7,6 +7,7 @@ from app.api import health, auth, users, organizations, tasks, projects, campaig
 from app.api.v1.endpoints import content_briefs, content_generation_control, advanced_generation
 from app.db.database import create_tables
 from app.core.prompt_initializer import PromptInitializer
+from app.core.http_client import close_session
 
 # Create database tables
 create_tables()
@@ -73,6 +74,11 @@ app.include_router(tavily_status.router, tags=["tavily"])
 from app.api import test_content_plans
 app.include_router(test_content_plans.router, tags=["test"])
 
+@app.on_event("shutdown")
+async def shutdown_http_session():
+    """Zamknięcie współdzielonej sesji HTTP"""
+    await close_session()
+
 @app.get("/")
 async def root():
     """Główny endpoint aplikacji"""
@@ -23,6 +23,7 @@ from app.core.deep_reasoning import (
 )
 from app.core.prompt_manager import PromptManager
 from app.core.ai_config_service import AIConfigService
+from app.core.http_client import close_session
 from app.tasks.content_generation import _call_gemini_api
 
 logger = logging.getLogger(__name__)
@@ -60,6 +61,7 @@ def advanced_contextualize_task(self, plan_id: int) -> Dict[str, Any]:
                 company_analysis = loop.run_until_complete(
                     knowledge_base.analyze_company_website(organization.website)
                 )
+                loop.run_until_complete(close_session())
                 loop.close()
             
             # Get industry insights
@@ -69,13 +71,18 @@ def advanced_contextualize_task(self, plan_id: int) -> Dict[str, Any]:
             industry_insights = loop.run_until_complete(
                 knowledge_base.get_industry_insights(industry)
             )
+            loop.run_until_complete(close_session())
             loop.close()
             
             # Get communication strategy with all related data
             strategy_data = _get_comprehensive_strategy(db, content_plan.organization_id)
             
             # Get and analyze briefs with enhanced analyzer
-            brief_analyzer = EnhancedBriefAnalyzer(db)
+            brief_analyzer = EnhancedBriefAnalyzer(
+                db,
+                ai_config=AIConfigService(db),
+                prompt_manager=PromptManager(db)
+            )
             brief_insights = _analyze_all_briefs(db, plan_id, organization, brief_analyzer)
             
             # Get rejected topics for learning
@@ -141,7 +148,11 @@ def generate_topics_with_reasoning_task(
         
         try:
             # Initialize reasoning engine
-            reasoning_engine = DeepReasoningEngine(db)
+            reasoning_engine = DeepReasoningEngine(
+                db,
+                ai_config=AIConfigService(db),
+                prompt_manager=PromptManager(db)
+            )
             
             # Extract context
             super_context = context_data["super_context"]
@@ -156,6 +167,7 @@ def generate_topics_with_reasoning_task(
                     "generate_topics"
                 )
             )
+            loop.run_until_complete(close_session())
             loop.close()
             
             # Extract generated topics
@@ -532,6 +544,7 @@ def _analyze_all_briefs(
             analysis = loop.run_until_complete(
                 analyzer.analyze_brief(brief.extracted_content[:5000], org_context)
             )
+            loop.run_until_complete(close_session())
             loop.close()
             
             # Aggregate insights
@@ -15,7 +15,6 @@ from app.db.models import (
 from app.db.schemas import CommunicationStrategyCreate
 from app.core.prompt_manager import PromptManager
 from app.core.ai_config_service import AIConfigService
-from app.core.dependencies import get_prompt_manager, get_ai_config_service
 
 # Importy do parsowania plików
 try:
@@ -18,6 +18,7 @@ from app.core.ai_config_service import AIConfigService
 from app.tasks.content_generation import _call_gemini_api  # Reuse existing Gemini integration
 from app.tasks.variant_generation import generate_all_variants_for_topic_task
 from app.core.external_integrations import ContentResearchOrchestrator
+from app.core.http_client import close_session
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -364,13 +365,17 @@ def generate_and_save_blog_topics_task(self, context_data: Dict[str, Any], plan_
                 use_deep_reasoning = (generation_method == 'deep_reasoning')
                 logger.info(f"Generation method: {generation_method}, use_deep_reasoning: {use_deep_reasoning}")
             
+            # AI prompt and model services, shared with the reasoning engine
+            prompt_manager = PromptManager(db)
+            ai_config = AIConfigService(db)
+            
             # Enhanced research with Tavily or Deep Reasoning
             if use_deep_reasoning:
                 logger.info("Using Deep Reasoning Engine for topic generation")
                 from app.core.deep_reasoning import DeepReasoningEngine
                 import asyncio
                 
-                reasoning_engine = DeepReasoningEngine(db)
+                reasoning_engine = DeepReasoningEngine(db, ai_config=ai_config, prompt_manager=prompt_manager)
                 
                 # Run async method in sync context
                 loop = asyncio.new_event_loop()
@@ -383,6 +388,7 @@ def generate_and_save_blog_topics_task(self, context_data: Dict[str, Any], plan_
                         )
                     )
                 finally:
+                    loop.run_until_complete(close_session())
                     loop.close()
                 
                 # Extract topics from reasoning result
@@ -393,9 +399,6 @@ def generate_and_save_blog_topics_task(self, context_data: Dict[str, Any], plan_
                 enhanced_context = _enhance_context_with_research(super_context)
             
             # Get AI prompt and model
-            prompt_manager = PromptManager(db)
-            ai_config = AIConfigService(db)
-            
             prompt_template = prompt_manager._get_cached_prompt("generate_blog_topics_for_selection")
             model_name = ai_config._get_cached_model("generate_blog_topics_for_selection")
             
@@ -804,6 +807,7 @@ def _enhance_context_with_research(super_context: Dict[str, Any]) -> Dict[str, A
                 db.close()
             
         finally:
+            loop.run_until_complete(close_session())
             loop.close()
         
         # Add research to context
@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 from app.db.database import SessionLocal
 from app.db.models import Organization, WebsiteAnalysis
 from app.core.external_integrations import TavilyIntegration
+from app.core.http_client import close_session
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +75,7 @@ def analyze_organization_website_task(
                 tavily.analyze_website(website_url, organization_name)
             )
         finally:
+            loop.run_until_complete(close_session())
             loop.close()
         
         # Check for errors
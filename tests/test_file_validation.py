@@ -0,0 +1,100 @@
+"""
+Tests for upload MIME detection (signature table in app.core.file_validation)
+"""
+
+import io
+import zipfile
+
+import pytest
+
+from app.core.file_validation import detect_mime
+
+
+CONTENT_TYPES_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    b'<Default Extension="xml" ContentType="application/xml"/></Types>'
+)
+
+RELS_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"/>'
+)
+
+
+def _zip_header(*names: str) -> bytes:
+    """Build a ZIP archive with the given entries and return its first 2 KB"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            archive.writestr(name, CONTENT_TYPES_XML if name == "[Content_Types].xml" else RELS_XML)
+    return buffer.getvalue()[:2048]
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF\x00", "image/jpeg"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", "image/png"),
+        (b"GIF87a\x01\x00\x01\x00", "image/gif"),
+        (b"GIF89a\x01\x00\x01\x00", "image/gif"),
+        (b"%PDF-1.7\n%\xe2\xe3\xcf\xd3", "application/pdf"),
+        (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "image/webp"),
+    ],
+)
+def test_detect_mime_signatures(header, expected):
+    assert detect_mime(header) == expected
+
+
+def test_detect_mime_riff_without_webp_falls_through():
+    assert detect_mime(b"RIFF\x24\x00\x00\x00WAVEfmt ") is None
+
+
+@pytest.mark.parametrize(
+    "part, expected",
+    [
+        ("word/document.xml", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+        ("xl/workbook.xml", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+        ("ppt/presentation.xml", "application/vnd.openxmlformats-officedocument.presentationml.presentation"),
+    ],
+)
+def test_detect_mime_ooxml(part, expected):
+    header = _zip_header("[Content_Types].xml", "_rels/.rels", part)
+    assert detect_mime(header) == expected
+
+
+def test_detect_mime_bare_zip_falls_through_to_libmagic():
+    header = _zip_header("readme.txt", "data/values.csv")
+    assert header.startswith(b"PK\x03\x04")
+    assert detect_mime(header) is None
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        b'<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1"></svg>',
+        b'\xef\xbb\xbf\n  <svg xmlns="http://www.w3.org/2000/svg"></svg>',
+        b'<?xml version="1.0" encoding="UTF-8"?>\n<svg xmlns="http://www.w3.org/2000/svg"></svg>',
+        b'<?xml version="1.0"?>\n<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" '
+        b'"http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">\n<svg></svg>',
+    ],
+)
+def test_detect_mime_svg(header):
+    assert detect_mime(header) == "image/svg+xml"
+
+
+def test_detect_mime_xml_without_svg_falls_through():
+    assert detect_mime(b'<?xml version="1.0"?>\n<note><to>Ada</to></note>') is None
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        b"plain text document\n",
+        b"name,value\n1,2\n",
+        b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",  # legacy Office (OLE2) - libmagic decides
+        b"",
+    ],
+)
+def test_detect_mime_unknown_falls_through(header):
+    assert detect_mime(header) is None